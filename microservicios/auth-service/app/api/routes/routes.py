@@ -1,16 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import base64
+import binascii
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from typing import List
-from datetime import timedelta
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime, timedelta, timezone
 from sqlmodel import Session
 
 # Importaciones de tu microservicio
-from app.core.config import ACCESS_TOKEN_EXPIRE_MINUTES
-from app.core.database import get_db
-from app.security.security import get_password_hash, verify_password, create_access_token, get_current_user_payload
-from app.domain.models.models import User
-from app.domain.schemas.schemas import UserCreate, UserUpdate, Token, UserRead
-from app.repository.crud import UserRepository
+from app.core.config import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    USER_BATCH_MAX_SIZE,
+    CHANGE_FEED_MAX_WAIT_SECONDS,
+    CHANGE_FEED_POLL_INTERVAL_SECONDS,
+)
+from app.core.change_feed import user_change_notifier
+from app.core.database import engine, get_db
+from app.security.security import (
+    get_password_hash_async,
+    verify_password_async,
+    create_access_token,
+    create_refresh_token,
+    hash_refresh_token,
+    get_current_user_payload,
+)
+from app.domain.models.models import User, UserChange
+from app.domain.schemas.schemas import (
+    UserCreate,
+    UserUpdate,
+    Token,
+    RefreshTokenRequest,
+    UserRead,
+    UserPage,
+    UserChangesPage,
+    UserBatchRequest,
+    UserBatchResponse,
+)
+from app.repository.crud import UserRepository, RefreshTokenRepository, UserAlreadyExistsError
 
 
 
@@ -26,6 +55,22 @@ def get_user_repository(db: Session = Depends(get_db)):
     return UserRepository(db)
 
 
+def get_refresh_token_repository(db: Session = Depends(get_db)):
+    """Dependencia para obtener el repositorio de refresh tokens."""
+    return RefreshTokenRepository(db)
+
+
+def _encode_cursor(user_id: UUID) -> str:
+    return base64.urlsafe_b64encode(user_id.bytes).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> UUID:
+    try:
+        return UUID(bytes=base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
 # ---------------------
 # Rutas de Autenticación
 # ---------------------
@@ -33,26 +78,112 @@ def get_user_repository(db: Session = Depends(get_db)):
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    user_repo: UserRepository = Depends(get_user_repository)
+    user_repo: UserRepository = Depends(get_user_repository),
+    refresh_repo: RefreshTokenRepository = Depends(get_refresh_token_repository)
 ):
     """
-    Ruta para autenticar un usuario y generar un token de acceso.
+    Ruta para autenticar un usuario y generar un token de acceso y un
+    refresh token.
     """
-    user = user_repo.get_user_by_username(form_data.username)
+    # Las consultas son síncronas: en el threadpool para no bloquear el event loop
+    user = await run_in_threadpool(user_repo.get_user_by_username, form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    refresh_token = create_refresh_token()
+    await run_in_threadpool(
+        refresh_repo.create, user.id, hash_refresh_token(refresh_token), _refresh_token_expiry()
+    )
+
+    return {
+        "access_token": _create_user_access_token(user),
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/token/refresh", response_model=Token)
+def refresh_access_token(
+    request: RefreshTokenRequest,
+    user_repo: UserRepository = Depends(get_user_repository),
+    refresh_repo: RefreshTokenRepository = Depends(get_refresh_token_repository)
+):
+    """
+    Emite un nuevo token de acceso a partir de un refresh token, sin volver a
+    verificar la contraseña. El refresh token usado se revoca y se devuelve
+    uno nuevo (rotación).
+    """
+    invalid_token_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    db_token = refresh_repo.get_by_hash(hash_refresh_token(request.refresh_token))
+    if db_token is None:
+        raise invalid_token_exception
+
+    if db_token.revoked:
+        # Un token ya rotado se está reutilizando: posible robo, se revocan todos
+        refresh_repo.revoke_all_for_user(db_token.user_id)
+        raise invalid_token_exception
+
+    if _as_utc(db_token.expires_at) <= datetime.now(timezone.utc):
+        raise invalid_token_exception
+
+    user = user_repo.get_user(db_token.user_id)
+    if user is None or not user.is_active:
+        raise invalid_token_exception
+
+    new_refresh_token = create_refresh_token()
+    rotated = refresh_repo.rotate(
+        db_token, hash_refresh_token(new_refresh_token), _refresh_token_expiry()
+    )
+    if rotated is None:
+        raise invalid_token_exception
+
+    return {
+        "access_token": _create_user_access_token(user),
+        "token_type": "bearer",
+        "refresh_token": new_refresh_token,
+    }
+
+
+@router.post("/token/revoke", status_code=status.HTTP_204_NO_CONTENT)
+def revoke_refresh_token(
+    request: RefreshTokenRequest,
+    refresh_repo: RefreshTokenRepository = Depends(get_refresh_token_repository)
+):
+    """
+    Revoca un refresh token (cierre de sesión). Es idempotente.
+    """
+    db_token = refresh_repo.get_by_hash(hash_refresh_token(request.refresh_token))
+    if db_token is not None and not db_token.revoked:
+        refresh_repo.revoke(db_token)
+
+
+def _create_user_access_token(user: User) -> str:
+    # `uid` y `roles` permiten a los demás servicios resolver al usuario
+    # a partir del token, sin consultar a este servicio
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+    return create_access_token(
+        data={"sub": user.username, "uid": str(user.id), "roles": user.roles or []},
+        expires_delta=access_token_expires,
     )
-    
-    return {"access_token": access_token, "token_type": "bearer"}
+
+
+def _refresh_token_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Algunos drivers devuelven fechas sin zona horaria aunque se guarden en UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
 
 
 # ---------------------
@@ -60,44 +191,106 @@ async def login_for_access_token(
 # ---------------------
 
 @router.post("/", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def create_user(
+async def create_user(
     user: UserCreate, 
     user_repo: UserRepository = Depends(get_user_repository)
 ):
     """
     Crea un nuevo usuario en la base de datos.
     """
-    db_user_by_username = user_repo.get_user_by_username(user.username)
-    if db_user_by_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered"
-        )
-    
-    db_user_by_email = user_repo.get_user_by_email(user.email)
-    if db_user_by_email:
+    hashed_password = await get_password_hash_async(user.password)
+    try:
+        new_user = await run_in_threadpool(user_repo.create_user, user, hashed_password)
+    except UserAlreadyExistsError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
+            detail=str(e)
         )
-            
-    hashed_password = get_password_hash(user.password)
-    new_user = user_repo.create_user(user, hashed_password)
-    
+
     return new_user
 
 
-@router.get("/", response_model=List[UserRead])
+@router.get("/", response_model=UserPage)
 def read_users(
-    offset: int = 0, 
-    limit: int = 100, 
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    include_total: bool = False,
     user_repo: UserRepository = Depends(get_user_repository)
 ):
     """
-    Obtiene una lista paginada de todos los usuarios.
+    Obtiene una lista paginada de todos los usuarios, ordenada por id.
+    Se pagina con el `next_cursor` de la respuesta anterior; `offset` se
+    mantiene por compatibilidad pero es lento en páginas profundas.
+    """
+    after_id = _decode_cursor(cursor) if cursor else None
+    # Se pide un elemento extra para saber si hay una página siguiente
+    users = user_repo.get_users(offset=offset, limit=limit + 1, after_id=after_id)
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = _encode_cursor(users[-1].id)
+
+    total = user_repo.count_users() if include_total else None
+    return UserPage(items=users, next_cursor=next_cursor, total=total)
+
+
+@router.post("/batch", response_model=UserBatchResponse)
+def read_users_batch(
+    batch: UserBatchRequest,
+    user_repo: UserRepository = Depends(get_user_repository)
+):
     """
-    users = user_repo.get_users(offset=offset, limit=limit)
-    return users
+    Resuelve varios usuarios por id y/o username en una sola consulta.
+    Los ids o usernames que no existen se devuelven con valor null.
+    """
+    ids = list(dict.fromkeys(batch.ids))
+    usernames = list(dict.fromkeys(batch.usernames))
+    if len(ids) + len(usernames) > USER_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch size exceeds the limit of {USER_BATCH_MAX_SIZE}"
+        )
+
+    users = user_repo.get_users_by_ids_or_usernames(ids, usernames)
+    found_by_id = {user.id: user for user in users}
+    found_by_username = {user.username: user for user in users}
+
+    return UserBatchResponse(
+        by_id={str(user_id): found_by_id.get(user_id) for user_id in ids},
+        by_username={username: found_by_username.get(username) for username in usernames},
+    )
+
+
+@router.get("/changes", response_model=UserChangesPage)
+async def read_user_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    wait: float = Query(0, ge=0, le=CHANGE_FEED_MAX_WAIT_SECONDS),
+):
+    """
+    Devuelve en orden los cambios de usuarios posteriores a `since`.
+    Con `wait` > 0 la petición espera (long-poll) hasta que haya cambios nuevos
+    o venza el tiempo indicado, en segundos.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        changes = await run_in_threadpool(_get_changes, since, limit)
+        remaining = deadline - time.monotonic()
+        if changes or remaining <= 0:
+            break
+        await user_change_notifier.wait(min(remaining, CHANGE_FEED_POLL_INTERVAL_SECONDS))
+
+    last_seq = changes[-1].seq if changes else since
+    return UserChangesPage(changes=changes, last_seq=last_seq)
+
+
+def _get_changes(since: int, limit: int) -> List[UserChange]:
+    # Sesión propia por consulta: mientras el long-poll espera no retiene
+    # ninguna conexión del pool (con get_db la tendría hasta responder)
+    with Session(engine) as db:
+        return UserRepository(db).get_changes(since=since, limit=limit)
 
 
 @router.get("/me/", response_model=UserRead)
@@ -112,7 +305,7 @@ async def read_users_me(
     if not username:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
     
-    user = user_repo.get_user_by_username(username)
+    user = await run_in_threadpool(user_repo.get_user_profile_by_username, username)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
         
@@ -120,11 +313,11 @@ async def read_users_me(
 
 
 @router.get("/{user_id}", response_model=UserRead)
-def read_user_by_id(user_id: str, user_repo: UserRepository = Depends(get_user_repository)):
+def read_user_by_id(user_id: UUID, user_repo: UserRepository = Depends(get_user_repository)):
     """
     Obtiene los datos de un usuario por su ID.
     """
-    user = user_repo.get_user(user_id)
+    user = user_repo.get_user_profile(user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -135,14 +328,14 @@ def read_user_by_username(username: str, user_repo: UserRepository = Depends(get
     """
     Obtiene los datos de un usuario por su nombre de usuario.
     """
-    user = user_repo.get_user_by_username(username)
+    user = user_repo.get_user_profile_by_username(username)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
 @router.patch("/by-username/{username}", response_model=UserRead)
-def update_user_by_username(
+async def update_user_by_username(
     username: str, 
     user: UserUpdate, 
     user_repo: UserRepository = Depends(get_user_repository)
@@ -150,17 +343,16 @@ def update_user_by_username(
     """
     Actualiza los datos de un usuario por su nombre de usuario.
     """
-    db_user = user_repo.get_user_by_username(username)
+    db_user = await run_in_threadpool(user_repo.get_user_by_username, username)
     if db_user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
     update_data = user.model_dump(exclude_unset=True) 
     
     if "password" in update_data:
-        # La función get_password_hash ya está importada y lista para usarse
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
     
-    updated_user = user_repo.update_user(db_user, update_data)
+    updated_user = await run_in_threadpool(user_repo.update_user, db_user, update_data)
     return updated_user
 
 
@@ -0,0 +1,50 @@
+# microservicios/auth-service/app/core/change_feed.py
+import asyncio
+import threading
+from typing import Set, Tuple
+
+
+class ChangeFeedNotifier:
+    """
+    Despierta a los long-polls de GET /users/changes cuando este proceso
+    escribe un evento en el outbox.
+
+    Los repositorios se ejecutan en el threadpool de FastAPI, así que `notify`
+    puede llamarse desde cualquier hilo. Los cambios escritos por otros
+    procesos se detectan igualmente porque la ruta vuelve a consultar la
+    base de datos cada cierto intervalo.
+    """
+
+    def __init__(self):
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+        self._lock = threading.Lock()
+
+    def notify(self) -> None:
+        with self._lock:
+            waiters = list(self._waiters)
+            self._waiters.clear()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    async def wait(self, timeout: float) -> bool:
+        """Espera hasta la próxima notificación. Devuelve False si vence el timeout."""
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+user_change_notifier = ChangeFeedNotifier()
@@ -7,6 +7,29 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# Pool de hashing de contraseñas (bcrypt)
+# "thread" o "process": bcrypt libera el GIL, así que los hilos suelen bastar
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+# Número máximo de hashes/verificaciones ejecutándose a la vez
+PASSWORD_HASH_MAX_WORKERS = int(os.getenv("PASSWORD_HASH_MAX_WORKERS", "4"))
+# Número máximo de operaciones esperando un worker antes de responder 503
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+# Caché de tokens JWT ya decodificados (0 la desactiva)
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+
+# Caché de perfiles de usuario para las rutas de lectura (tamaño 0 la desactiva)
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+# Feed de cambios de usuarios (GET /users/changes)
+CHANGE_FEED_MAX_WAIT_SECONDS = float(os.getenv("CHANGE_FEED_MAX_WAIT_SECONDS", "30"))
+# Cada cuánto se vuelve a consultar el outbox durante un long-poll
+CHANGE_FEED_POLL_INTERVAL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_INTERVAL_SECONDS", "1"))
+
+# Máximo de ids + usernames aceptados por POST /users/batch
+USER_BATCH_MAX_SIZE = int(os.getenv("USER_BATCH_MAX_SIZE", "500"))
+
 # Configuración de la base de datos
 DB_USER = os.getenv("POSTGRES_USER", "user")
 DB_PASSWORD = os.getenv("POSTGRES_PASSWORD", "password")
@@ -16,4 +39,5 @@ DB_NAME = os.getenv("POSTGRES_DB", "auth_db")
 
 # Construir la URL de la base de datos
 # Esta URL usará 'db' como host por defecto, lo que permite la comunicación entre contenedores
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
\ No newline at end of file
+# DATABASE_URL completa tiene prioridad (p. ej. SQLite en pruebas y benchmarks)
+DATABASE_URL = os.getenv("DATABASE_URL", f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
\ No newline at end of file
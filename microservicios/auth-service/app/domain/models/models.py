@@ -1,9 +1,11 @@
 # microservicios/auth-service/app/models.py
 
-from typing import Optional, List
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any
 from uuid import UUID, uuid4
 from sqlmodel import Field, SQLModel, Column
 from pydantic import EmailStr
+from sqlalchemy import DateTime
 from sqlalchemy.dialects.postgresql import JSON
 
 class User(SQLModel, table=True): 
@@ -19,3 +21,25 @@ class User(SQLModel, table=True):
     is_active: bool = Field(default=True)
     is_admin: bool = Field(default=False)
 
+
+class RefreshToken(SQLModel, table=True):
+    # Solo se guarda el SHA-256 del token; el valor en claro lo tiene el cliente
+    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    user_id: UUID = Field(foreign_key="user.id", ondelete="CASCADE", index=True, nullable=False)
+    token_hash: str = Field(unique=True, index=True, nullable=False)
+    expires_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    revoked: bool = Field(default=False)
+
+
+class UserChange(SQLModel, table=True):
+    # Outbox: un evento por alta, modificación o baja, escrito en la misma
+    # transacción que el cambio. `seq` da el orden del feed.
+    seq: Optional[int] = Field(default=None, primary_key=True)
+    user_id: UUID = Field(index=True, nullable=False)
+    event_type: str = Field(nullable=False)  # created | updated | deleted
+    username: str = Field(nullable=False)
+    payload: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
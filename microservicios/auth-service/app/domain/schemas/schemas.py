@@ -1,5 +1,6 @@
 
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Dict, Any
 from uuid import UUID, uuid4
 from sqlmodel import Field, SQLModel, Column
 from pydantic import EmailStr
@@ -42,6 +43,45 @@ class UserRead(SQLModel):
     is_admin: bool
 
 
+class UserPage(SQLModel):
+    items: List[UserRead]
+    # Cursor opaco para pedir la página siguiente; null en la última página
+    next_cursor: Optional[str] = None
+    # Solo se calcula con include_total=true
+    total: Optional[int] = None
+
+
+class UserChangeRead(SQLModel):
+    seq: int
+    user_id: UUID
+    event_type: str
+    username: str
+    payload: Dict[str, Any] = {}
+    created_at: datetime
+
+
+class UserChangesPage(SQLModel):
+    changes: List[UserChangeRead]
+    # Valor de `since` para la siguiente petición
+    last_seq: int
+
+
+class UserBatchRequest(SQLModel):
+    ids: List[UUID] = []
+    usernames: List[str] = []
+
+
+class UserBatchResponse(SQLModel):
+    # Las claves no encontradas aparecen con valor null
+    by_id: Dict[str, Optional[UserRead]] = {}
+    by_username: Dict[str, Optional[UserRead]] = {}
+
+
 class Token(SQLModel):
     access_token: str
-    token_type: str = "bearer"
\ No newline at end of file
+    token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+
+
+class RefreshTokenRequest(SQLModel):
+    refresh_token: str
\ No newline at end of file
@@ -1,56 +1,250 @@
+from datetime import datetime
 from typing import List, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlmodel import Session, select
-from app.domain.models.models import User
-from app.domain.schemas.schemas import UserCreate, UserUpdate
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, or_, func, insert, update
+from app.core.cache import LRUCache
+from app.core.change_feed import user_change_notifier
+from app.core.config import USER_CACHE_MAX_SIZE, USER_CACHE_TTL_SECONDS
+from app.domain.models.models import User, RefreshToken, UserChange
+from app.domain.schemas.schemas import UserCreate, UserUpdate, UserRead
 from app.security.security import get_password_hash
 
+# Perfiles (UserRead) servidos por las rutas de lectura, por id y por username.
+# Se invalidan en update_user/delete_user; otros procesos ven el cambio al expirar el TTL.
+user_cache = LRUCache(max_size=USER_CACHE_MAX_SIZE, default_ttl=USER_CACHE_TTL_SECONDS)
+
+
+# Clave del advisory lock que serializa las escrituras en el outbox
+_USER_CHANGES_LOCK_KEY = 734_001
+
+
+class UserAlreadyExistsError(ValueError):
+    """El username o el email ya están registrados."""
+
+    def __init__(self, field: str):
+        self.field = field
+        super().__init__(f"{field.capitalize()} already registered")
+
+
+def _conflicting_field(error: IntegrityError) -> str:
+    # psycopg2 expone el nombre del índice violado (ix_user_email / ix_user_username)
+    diag = getattr(error.orig, "diag", None)
+    constraint = getattr(diag, "constraint_name", None) or str(error.orig)
+    return "email" if "email" in constraint else "username"
+
+
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
 
     def create_user(self, user: UserCreate, hashed_password: str) -> User:
-        db_user = User(
+        """
+        Inserta el usuario y lo devuelve en la misma sentencia (INSERT ... RETURNING).
+        Los duplicados los detectan los índices únicos de username y email.
+        """
+        statement = insert(User).values(
+            id=uuid4(),
             username=user.username,
             email=user.email,
             hashed_password=hashed_password,
+            roles=[],
             age=user.age,
             sex=user.sex,
             objective=user.objective,
             is_admin=False,
             is_active=True,
-        )
-        self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        ).returning(User)
+        try:
+            db_user = self.db.scalars(statement).one()
+            self._record_change(db_user, "created")
+            # Fuera de la sesión el commit no expira el objeto: no hace falta refresh
+            self.db.expunge(db_user)
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            raise UserAlreadyExistsError(_conflicting_field(e)) from e
+        user_change_notifier.notify()
         return db_user
 
     def get_user(self, user_id: UUID) -> Optional[User]:
         return self.db.get(User, user_id)
 
-    def get_users(self, offset: int = 0, limit: int = 100) -> List[User]:
-        statement = select(User).offset(offset).limit(limit)
-        return self.db.exec(statement).all()
+    def get_users(
+        self, offset: int = 0, limit: int = 100, after_id: Optional[UUID] = None
+    ) -> List[User]:
+        """
+        Lista usuarios ordenados por id (clave primaria).
+        Con `after_id` se pagina por keyset y se ignora `offset`.
+        """
+        statement = select(User).order_by(User.id)
+        if after_id is not None:
+            statement = statement.where(User.id > after_id)
+        elif offset:
+            statement = statement.offset(offset)
+        return self.db.exec(statement.limit(limit)).all()
+
+    def count_users(self) -> int:
+        return self.db.exec(select(func.count()).select_from(User)).one()
 
     def get_user_by_username(self, username: str) -> Optional[User]:
         statement = select(User).where(User.username == username)
         return self.db.exec(statement).first()
 
+    def get_users_by_ids_or_usernames(
+        self, ids: List[UUID], usernames: List[str]
+    ) -> List[User]:
+        """Resuelve varios usuarios por id y/o username en una sola consulta."""
+        conditions = []
+        if ids:
+            conditions.append(User.id.in_(ids))
+        if usernames:
+            conditions.append(User.username.in_(usernames))
+        if not conditions:
+            return []
+        statement = select(User).where(or_(*conditions))
+        return self.db.exec(statement).all()
+
+    def get_user_profile(self, user_id: UUID) -> Optional[UserRead]:
+        """Como get_user, pero servido desde la caché de perfiles si es posible."""
+        profile = user_cache.get(("id", str(user_id)))
+        if profile is not None:
+            return profile
+        user = self.get_user(user_id)
+        return self._cache_profile(user) if user else None
+
+    def get_user_profile_by_username(self, username: str) -> Optional[UserRead]:
+        """Como get_user_by_username, pero servido desde la caché de perfiles si es posible."""
+        profile = user_cache.get(("username", username))
+        if profile is not None:
+            return profile
+        user = self.get_user_by_username(username)
+        return self._cache_profile(user) if user else None
+
+    def _cache_profile(self, user: User) -> UserRead:
+        profile = UserRead.model_validate(user)
+        user_cache.set(("id", str(user.id)), profile)
+        user_cache.set(("username", user.username), profile)
+        return profile
+
+    def _invalidate_profile(self, user_id: UUID, *usernames: str) -> None:
+        user_cache.delete(("id", str(user_id)))
+        for username in usernames:
+            user_cache.delete(("username", username))
+
     def get_user_by_email(self, email: str) -> Optional[User]:
         statement = select(User).where(User.email == email)
         return self.db.exec(statement).first()
 
     def update_user(self, db_user: User, update_data: dict) -> User:
+        old_username = db_user.username
         # Usa .model_validate para actualizar solo los campos pasados en el dict
         for key, value in update_data.items():
             setattr(db_user, key, value)
         
         self.db.add(db_user)
+        self._record_change(
+            db_user,
+            "updated",
+            changed_fields=sorted(key for key in update_data if key != "hashed_password"),
+            previous_username=old_username,
+        )
         self.db.commit()
         self.db.refresh(db_user)
+        self._invalidate_profile(db_user.id, old_username, db_user.username)
+        user_change_notifier.notify()
         return db_user
 
     def delete_user(self, db_user: User) -> None:
+        user_id, username = db_user.id, db_user.username
+        self._record_change(db_user, "deleted")
         self.db.delete(db_user)
         self.db.commit()
+        self._invalidate_profile(user_id, username)
+        user_change_notifier.notify()
+
+    def get_changes(self, since: int = 0, limit: int = 100) -> List[UserChange]:
+        """Eventos del outbox con `seq` mayor que `since`, en orden."""
+        statement = (
+            select(UserChange)
+            .where(UserChange.seq > since)
+            .order_by(UserChange.seq)
+            .limit(limit)
+        )
+        return self.db.exec(statement).all()
+
+    def _record_change(self, db_user: User, event_type: str, **extra) -> None:
+        """
+        Añade el evento al outbox dentro de la transacción en curso.
+        En Postgres se toma un advisory lock de transacción para que el orden
+        de `seq` coincida con el orden de commit y ningún consumidor se salte
+        un evento que todavía no estaba confirmado.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.exec(text("SELECT pg_advisory_xact_lock(:key)").bindparams(key=_USER_CHANGES_LOCK_KEY))
+        payload = {
+            "email": db_user.email,
+            "roles": db_user.roles,
+            "is_active": db_user.is_active,
+            "is_admin": db_user.is_admin,
+            **extra,
+        }
+        self.db.add(UserChange(
+            user_id=db_user.id,
+            event_type=event_type,
+            username=db_user.username,
+            payload=payload,
+        ))
+
+
+class RefreshTokenRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, user_id: UUID, token_hash: str, expires_at: datetime) -> RefreshToken:
+        db_token = RefreshToken(user_id=user_id, token_hash=token_hash, expires_at=expires_at)
+        self.db.add(db_token)
+        self.db.commit()
+        return db_token
+
+    def get_by_hash(self, token_hash: str) -> Optional[RefreshToken]:
+        statement = select(RefreshToken).where(RefreshToken.token_hash == token_hash)
+        return self.db.exec(statement).first()
+
+    def rotate(
+        self, db_token: RefreshToken, new_token_hash: str, expires_at: datetime
+    ) -> Optional[RefreshToken]:
+        """
+        Revoca `db_token` y crea su sustituto en la misma transacción.
+        Devuelve None si otro proceso ya lo había usado (revocación condicional).
+        """
+        result = self.db.exec(
+            update(RefreshToken)
+            .where(RefreshToken.id == db_token.id, RefreshToken.revoked == False)  # noqa: E712
+            .values(revoked=True)
+        )
+        if result.rowcount != 1:
+            self.db.rollback()
+            return None
+
+        new_token = RefreshToken(
+            user_id=db_token.user_id, token_hash=new_token_hash, expires_at=expires_at
+        )
+        self.db.add(new_token)
+        self.db.commit()
+        return new_token
+
+    def revoke(self, db_token: RefreshToken) -> None:
+        db_token.revoked = True
+        self.db.add(db_token)
+        self.db.commit()
+
+    def revoke_all_for_user(self, user_id: UUID) -> None:
+        self.db.exec(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked == False)  # noqa: E712
+            .values(revoked=True)
+        )
+        self.db.commit()
@@ -1,9 +1,22 @@
 # microservicios/auth-service/app/security.py
+import asyncio
+import hashlib
+import secrets
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional,Dict
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from app.core.config import SECRET_KEY, ALGORITHM
+from app.core.config import (
+    SECRET_KEY,
+    ALGORITHM,
+    PASSWORD_HASH_EXECUTOR,
+    PASSWORD_HASH_MAX_WORKERS,
+    PASSWORD_HASH_MAX_QUEUE,
+    TOKEN_CACHE_MAX_SIZE,
+)
+from app.core.cache import LRUCache
 from fastapi import Depends, HTTPException, status 
 from fastapi.security import OAuth2PasswordBearer 
 
@@ -22,6 +35,79 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+# ---------------------
+# Hashing asíncrono
+# ---------------------
+# bcrypt tarda ~250 ms por llamada: ejecutarlo en el event loop bloquea todas
+# las demás peticiones del worker. Estas variantes lo delegan a un pool acotado.
+
+_hash_executor: Optional[Executor] = None
+_hash_in_flight = 0
+
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+    if _hash_executor is None:
+        if PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_MAX_WORKERS)
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_MAX_WORKERS, thread_name_prefix="password-hash"
+            )
+    return _hash_executor
+
+
+async def _run_in_hash_pool(func, *args):
+    """
+    Ejecuta `func` en el pool de hashing. Si ya hay demasiadas operaciones
+    pendientes se rechaza la petición con 503 en lugar de encolarla sin límite.
+    """
+    global _hash_in_flight
+    if _hash_in_flight >= PASSWORD_HASH_MAX_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, try again later",
+            headers={"Retry-After": "1"},
+        )
+    _hash_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _hash_in_flight -= 1
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hashea una contraseña en el pool de hashing sin bloquear el event loop."""
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verifica una contraseña en el pool de hashing sin bloquear el event loop."""
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+def shutdown_password_hasher() -> None:
+    """Libera los workers del pool de hashing al apagar la aplicación."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
+
+def create_refresh_token() -> str:
+    """Genera un refresh token opaco y aleatorio."""
+    return secrets.token_urlsafe(48)
+
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Digest con el que se guarda un refresh token. Al ser un valor aleatorio de
+    alta entropía basta con SHA-256: no hace falta bcrypt.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Crea un token de acceso JWT."""
@@ -35,13 +121,31 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Payloads ya verificados, indexados por el digest del token.
+# Cada entrada expira en el claim `exp` del propio token.
+token_cache = LRUCache(max_size=TOKEN_CACHE_MAX_SIZE)
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def verify_token(token: str) -> Optional[dict]:
     """Verifica un token JWT y devuelve el payload si es válido, None si no."""
+    digest = _token_digest(token)
+    cached = token_cache.get(digest)
+    if cached is not None:
+        return dict(cached)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
-        return None 
+        return None
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp > time.time():
+        token_cache.set(digest, dict(payload), expires_at=exp)
+    return payload
     
 
 def get_current_user_payload(
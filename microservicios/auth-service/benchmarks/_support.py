@@ -0,0 +1,45 @@
+# benchmarks/_support.py
+"""Base de datos SQLite temporal, cliente en proceso y resumen de latencias para los benchmarks."""
+import os
+import statistics
+import tempfile
+
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="auth-bench-"), "auth.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_PATH}")
+
+import httpx  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+import main  # noqa: E402
+from app.core.database import engine  # noqa: E402
+
+USERNAME = "bench"
+PASSWORD = "bench-password"
+CREDENTIALS = {"username": USERNAME, "password": PASSWORD}
+
+
+def app_client() -> httpx.AsyncClient:
+    """Cliente contra la app en el mismo proceso y event loop (sin red)."""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://auth")
+
+
+async def setup_database() -> None:
+    """Crea las tablas y el usuario de los benchmarks."""
+    SQLModel.metadata.create_all(engine)
+    async with app_client() as client:
+        response = await client.post(
+            "/users/", json={"username": USERNAME, "email": "bench@example.com", "password": PASSWORD}
+        )
+        response.raise_for_status()
+
+
+def percentile(values, q: int) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1] if len(values) > 1 else values[0]
+
+
+def summary(name: str, latencies) -> str:
+    ms = [latency * 1000 for latency in latencies]
+    return (
+        f"{name:<10} n={len(ms):<6} p50={percentile(ms, 50):8.1f} ms  "
+        f"p99={percentile(ms, 99):8.1f} ms  max={max(ms):8.1f} ms"
+    )
@@ -0,0 +1,76 @@
+# benchmarks/bench_login.py
+"""
+Latencia de login y de GET /users/me/ con el servicio bajo carga mixta.
+
+Varios clientes hacen login sin parar (bcrypt) mientras otro consulta
+/users/me/ en bucle. Se compara el pool de hashing ("pool") con bcrypt
+ejecutado en el event loop ("inline", el comportamiento anterior). Usa
+SQLite y la app en proceso (httpx.ASGITransport); no necesita PostgreSQL. Uso:
+
+    python -m benchmarks.bench_login [--duration 10] [--logins 8]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._support import CREDENTIALS, app_client, setup_database, summary
+from app.security import security
+
+ME_INTERVAL_SECONDS = 0.02
+
+
+async def _inline_hash_pool(func, *args):
+    # Comportamiento anterior: bcrypt directamente en el event loop
+    return func(*args)
+
+
+async def _run(duration: float, logins: int) -> None:
+    async with app_client() as client:
+        token = (await client.post("/users/token", data=CREDENTIALS)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        login_latencies, me_latencies = [], []
+        deadline = time.perf_counter() + duration
+
+        async def login_worker():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.post("/users/token", data=CREDENTIALS)
+                response.raise_for_status()
+                login_latencies.append(time.perf_counter() - start)
+
+        async def me_worker():
+            # Peticiones a intervalos fijos: la latencia se mide desde la hora
+            # prevista, así incluye el tiempo que el event loop estuvo bloqueado
+            scheduled = time.perf_counter()
+            while scheduled < deadline:
+                await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+                response = await client.get("/users/me/", headers=headers)
+                response.raise_for_status()
+                me_latencies.append(time.perf_counter() - scheduled)
+                scheduled += ME_INTERVAL_SECONDS
+
+        await asyncio.gather(me_worker(), *(login_worker() for _ in range(logins)))
+
+    print(summary("login", login_latencies))
+    print(summary("/users/me/", me_latencies))
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por modo")
+    parser.add_argument("--logins", type=int, default=8, help="clientes haciendo login a la vez")
+    args = parser.parse_args()
+
+    asyncio.run(setup_database())
+
+    pooled = security._run_in_hash_pool
+    for mode, hash_pool in (("inline", _inline_hash_pool), ("pool", pooled)):
+        security._run_in_hash_pool = hash_pool
+        print(f"--- {mode} ({args.logins} logins concurrentes, {args.duration:.0f} s)")
+        asyncio.run(_run(args.duration, args.logins))
+    security._run_in_hash_pool = pooled
+    security.shutdown_password_hasher()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,60 @@
+# benchmarks/bench_refresh.py
+"""
+Throughput de renovación de tokens: login con contraseña (bcrypt) frente a
+POST /users/token/refresh (SHA-256 y rotación del refresh token).
+
+Cada cliente repite la operación durante `--duration` segundos; en el modo
+refresh cada uno usa el refresh token que le devolvió la llamada anterior.
+Usa SQLite y la app en proceso; no necesita PostgreSQL. Uso:
+
+    python -m benchmarks.bench_refresh [--duration 10] [--clients 8]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._support import CREDENTIALS, app_client, setup_database, summary
+from app.security import security
+
+
+async def _run(mode: str, duration: float, clients: int) -> None:
+    async with app_client() as client:
+        # Refresh token inicial de cada cliente, fuera del tiempo medido
+        logins = await asyncio.gather(*(client.post("/users/token", data=CREDENTIALS) for _ in range(clients)))
+        latencies = []
+        deadline = time.perf_counter() + duration
+
+        async def worker(refresh_token: str):
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                if mode == "password":
+                    response = await client.post("/users/token", data=CREDENTIALS)
+                else:
+                    response = await client.post("/users/token/refresh", json={"refresh_token": refresh_token})
+                response.raise_for_status()
+                refresh_token = response.json()["refresh_token"]
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(login.json()["refresh_token"]) for login in logins))
+        elapsed = time.perf_counter() - started
+
+    print(f"{mode:<10} {len(latencies) / elapsed:8.1f} tokens/s")
+    print(summary(mode, latencies))
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por modo")
+    parser.add_argument("--clients", type=int, default=8, help="clientes concurrentes")
+    args = parser.parse_args()
+
+    asyncio.run(setup_database())
+    for mode in ("password", "refresh"):
+        print(f"--- {mode} ({args.clients} clientes, {args.duration:.0f} s)")
+        asyncio.run(_run(mode, args.duration, args.clients))
+    security.shutdown_password_hasher()
+
+
+if __name__ == "__main__":
+    main_cli()
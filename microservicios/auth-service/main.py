@@ -1,19 +1,18 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
-from sqlmodel import SQLModel, create_engine
+from sqlmodel import SQLModel
 
 # Importaciones de tu microservicio de autenticación
 from app.api.routes import routes as auth_router
-from app.core.database import get_db
-from app.core.config import DATABASE_URL
+from app.core.database import engine
+from app.security.security import shutdown_password_hasher, token_cache
+from app.repository.crud import user_cache
 
 # ---------------------
 # Configuración de la base de datos
 # ---------------------
 
-engine = create_engine(DATABASE_URL)
-
 def create_db_and_tables():
     """
     Crea las tablas de la base de datos a partir de los modelos de SQLModel.
@@ -26,10 +25,11 @@ def create_db_and_tables():
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """
     Función de ciclo de vida para la aplicación FastAPI.
-    Se ejecuta al iniciar la aplicación.
+    Se ejecuta al iniciar la aplicación y al detenerla.
     """
     create_db_and_tables()
     yield
+    shutdown_password_hasher()
 
 # ---------------------
 # Inicialización de la aplicación
@@ -58,3 +58,14 @@ def read_root():
     Ruta de bienvenida del servicio.
     """
     return {"message": "Bienvenido al Microservicio de Autenticación"}
+
+
+@app.get("/stats", tags=["Root"])
+def read_stats():
+    """
+    Contadores de las cachés en memoria de este proceso.
+    """
+    return {
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+    }
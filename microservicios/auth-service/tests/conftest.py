@@ -0,0 +1,18 @@
+# tests/conftest.py
+import os
+import tempfile
+
+# Antes de importar la app: la configuración lee DATABASE_URL al cargarse
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="auth-tests-"), "auth.db")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    # El lifespan crea las tablas en la base de datos SQLite temporal
+    with TestClient(main.app) as test_client:
+        yield test_client
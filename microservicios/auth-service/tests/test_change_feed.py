@@ -0,0 +1,99 @@
+# tests/test_change_feed.py
+import threading
+import time
+import uuid
+
+from app.core.database import engine
+
+
+class InMemoryUserReplica:
+    """
+    Consumidor de GET /users/changes: mantiene una réplica local
+    user_id -> datos del usuario, como haría otro servicio.
+    """
+
+    def __init__(self, client, since: int = 0):
+        self.client = client
+        self.since = since
+        self.users = {}
+
+    def poll(self, wait: float = 0):
+        page = self.client.get("/users/changes", params={"since": self.since, "wait": wait}).json()
+        for change in page["changes"]:
+            if change["event_type"] == "deleted":
+                self.users.pop(change["user_id"], None)
+            else:
+                self.users[change["user_id"]] = {"username": change["username"], **change["payload"]}
+        self.since = page["last_seq"]
+        return page["changes"]
+
+
+def _replica_at_head(client) -> InMemoryUserReplica:
+    # Empieza tras los eventos de otras pruebas
+    replica = InMemoryUserReplica(client)
+    while replica.poll():
+        pass
+    return replica
+
+
+def _create_user(client, username: str) -> dict:
+    response = client.post(
+        "/users/", json={"username": username, "email": f"{username}@example.com", "password": "secret"}
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_replica_follows_create_rename_and_delete(client):
+    replica = _replica_at_head(client)
+    username = f"ana-{uuid.uuid4().hex[:8]}"
+
+    user = _create_user(client, username)
+    assert [change["event_type"] for change in replica.poll()] == ["created"]
+    assert replica.users[user["id"]]["username"] == username
+
+    renamed = f"{username}-new"
+    assert client.patch(f"/users/by-username/{username}", json={"username": renamed}).status_code == 200
+    changes = replica.poll()
+    assert [change["event_type"] for change in changes] == ["updated"]
+    assert changes[0]["payload"]["previous_username"] == username
+    assert replica.users[user["id"]]["username"] == renamed
+
+    assert client.delete(f"/users/by-username/{renamed}").status_code == 204
+    assert [change["event_type"] for change in replica.poll()] == ["deleted"]
+    assert user["id"] not in replica.users
+    assert replica.poll() == []
+
+
+def test_long_poll_wakes_up_on_write(client):
+    replica = _replica_at_head(client)
+    result = {}
+
+    def consume():
+        started = time.monotonic()
+        result["changes"] = replica.poll(wait=10)
+        result["elapsed"] = time.monotonic() - started
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    time.sleep(0.3)
+    user = _create_user(client, f"luis-{uuid.uuid4().hex[:8]}")
+    consumer.join(timeout=10)
+
+    assert [change["user_id"] for change in result["changes"]] == [user["id"]]
+    assert result["elapsed"] < 10
+    assert user["id"] in replica.users
+
+
+def test_long_poll_does_not_hold_a_connection(client):
+    replica = _replica_at_head(client)
+    consumer = threading.Thread(target=replica.poll, kwargs={"wait": 1.5})
+    consumer.start()
+    time.sleep(0.5)
+    try:
+        # Esperando no tiene ninguna conexión del pool y las demás rutas responden
+        assert engine.pool.checkedout() == 0
+        assert client.get("/users/by-username/nobody").status_code == 404
+    finally:
+        consumer.join(timeout=5)
+    assert replica.poll() == []
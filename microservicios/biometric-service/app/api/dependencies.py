@@ -1,20 +1,11 @@
 # app/api/dependencies.py
 
-from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+from app.core.database import get_db
 from fastapi import Depends
 
 from app.repository.bometric_repo import BiometricRepository
 from app.servicies.biometric_service import BiometricService
 
-def get_db():
-    # ... (código para la sesión de base de datos)
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 def get_biometric_repository() -> BiometricRepository:
     return BiometricRepository()
 
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
 
 from app.api.dependencies import get_db, get_biometric_service
+from app.core.security import TokenUser, get_optional_token_user
 from app.domain.schemas.schemas import (
     BiometricCreateRequest,
     BiometricRead
@@ -17,11 +18,12 @@ router = APIRouter(prefix="/biometrics", tags=["Biometrics"])
 @router.post("/biometrics", response_model=BiometricRead, status_code=status.HTTP_201_CREATED)
 async def create_biometric_record(
     biometric_data: BiometricCreateRequest,  
-    db: Session = Depends(get_db),
-    biometric_service: BiometricService = Depends(get_biometric_service)
+    db: AsyncSession = Depends(get_db),
+    biometric_service: BiometricService = Depends(get_biometric_service),
+    current_user: Optional[TokenUser] = Depends(get_optional_token_user)
 ):
     try:
-        new_biometric = await biometric_service.create_new_record(db, biometric_data)
+        new_biometric = await biometric_service.create_new_record(db, biometric_data, current_user)
         return new_biometric
     except ValueError as e:
         raise HTTPException(
@@ -30,15 +32,15 @@ async def create_biometric_record(
         )
 
 @router.get("/user/{user_id}", response_model=List[BiometricRead])
-def get_user_metrics_by_id(
+async def get_user_metrics_by_id(
     user_id: UUID,
     biometric_service: BiometricService = Depends(get_biometric_service),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Obtiene todos los registros biométricos de un usuario por su ID.
     """
-    records = biometric_service.get_biometric_data_by_user(db, user_id)
+    records = await biometric_service.get_biometric_data_by_user(db, user_id)
     if not records:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -51,7 +53,7 @@ def get_user_metrics_by_id(
 async def get_user_metrics_by_name(
     user_name: str,
     biometric_service: BiometricService = Depends(get_biometric_service),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Obtiene todos los registros biométricos de un usuario por su nombre.
@@ -66,30 +68,30 @@ async def get_user_metrics_by_name(
 
 
 @router.get("/analysis/user/{user_id}/type/{data_type}")
-def get_user_progress_analysis(
+async def get_user_progress_analysis(
     user_id: UUID,
     data_type: str,
     biometric_service: BiometricService = Depends(get_biometric_service),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Provee un análisis de progreso para un tipo de dato biométrico específico.
     """
-    analysis = biometric_service.analyze_progress(db, user_id, data_type)
+    analysis = await biometric_service.analyze_progress(db, user_id, data_type)
     return analysis
 
 
 @router.patch("/{biometric_id}", response_model=BiometricRead)
-def update_biometric_record(
+async def update_biometric_record(
     biometric_id: UUID,
     biometric_update: BiometricCreateRequest,
     biometric_service: BiometricService = Depends(get_biometric_service),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Actualiza un registro biométrico existente por su ID.
     """
-    updated_record = biometric_service.update_record(db, biometric_id, biometric_update)
+    updated_record = await biometric_service.update_record(db, biometric_id, biometric_update)
     if not updated_record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -99,15 +101,15 @@ def update_biometric_record(
 
 
 @router.delete("/{biometric_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_biometric_record(
+async def delete_biometric_record(
     biometric_id: UUID,
     biometric_service: BiometricService = Depends(get_biometric_service),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Elimina un registro biométrico por su ID.
     """
-    was_deleted = biometric_service.delete_record(db, biometric_id)
+    was_deleted = await biometric_service.delete_record(db, biometric_id)
     if not was_deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -9,4 +9,18 @@ class Settings:
     # Si estás en desarrollo local sin Docker Compose, usaría localhost:5433 o localhost:5432
     # Pero dentro de Docker Compose, el nombre del servicio es clave.
 
+    # Misma clave y algoritmo que auth-service: permite validar sus JWT localmente
+    SECRET_KEY: str = os.getenv("SECRET_KEY", "8b2b7bd1ea2fc45d4fc8c7068a1d3f20316f487b807f3ab1118f063605079174")
+    ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
+
+    # Cliente HTTP compartido para llamar a auth-service
+    AUTH_SERVICE_URL: str = os.getenv("AUTH_SERVICE_URL", "http://auth-service:8001")
+    HTTP_TIMEOUT_SECONDS: float = float(os.getenv("HTTP_TIMEOUT_SECONDS", "5.0"))
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    # httpcore cierra las conexiones libres en cuanto el pool supera este número:
+    # por debajo de HTTP_MAX_CONNECTIONS, con más llamadas a la vez no se reutilizan
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", os.getenv("HTTP_MAX_CONNECTIONS", "100")))
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+
 settings = Settings()
\ No newline at end of file
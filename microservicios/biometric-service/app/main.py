@@ -1,15 +1,31 @@
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
 from fastapi import FastAPI
 from app.api.routers.biometrics_routes import router as biometric_router
 from app.core.database import engine
 from app.domain.models import Base
+from app.servicies.http_client import start_http_client, close_http_client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    """
+    Crea las tablas y abre el cliente HTTP compartido hacia auth-service;
+    al apagar cierra el cliente y el pool de conexiones.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    start_http_client()
+    yield
+    await close_http_client()
+    await engine.dispose()
 
-# Crear todas las tablas al iniciar la app
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Performance Biometrics Microservice",
     description="Microservicio para gestionar datos biométricos de rendimiento.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Incluir el objeto router
@@ -1,5 +1,6 @@
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
 from app.domain.schemas.schemas import BiometricRead,BiometricCreateData,BiometricUpdate
@@ -8,7 +9,7 @@ from app.domain.models.models import Biometric as BiometricModel
 
 class BiometricRepository:
 
-    def create(self, db: Session, biometric: BiometricCreateData) -> BiometricModel:
+    async def create(self, db: AsyncSession, biometric: BiometricCreateData) -> BiometricModel:
     
         biometric_data_for_db = biometric.model_dump(exclude={"username"})
         
@@ -16,47 +17,47 @@ class BiometricRepository:
         db_biometric = BiometricModel(**biometric_data_for_db)
         
         db.add(db_biometric)
-        db.commit()
-        db.refresh(db_biometric)
+        await db.commit()
+        await db.refresh(db_biometric)
         
         return db_biometric  
 
-    def get_by_id(self, db: Session, biometric_id: UUID) -> Optional[BiometricRead]:
+    async def get_by_id(self, db: AsyncSession, biometric_id: UUID) -> Optional[BiometricRead]:
             """Obtiene un registro biométrico por su ID."""
-            return db.query(BiometricModel).filter(BiometricModel.biometricId == biometric_id).first()
+            return await db.get(BiometricModel, biometric_id)
         
-    def get_by_user_id(self, db: Session, user_id: UUID) -> List[BiometricRead]:
+    async def get_by_user_id(self, db: AsyncSession, user_id: UUID) -> List[BiometricRead]:
             """Obtiene todos los registros biométricos de un usuario."""
-            return db.query(BiometricModel).filter(BiometricModel.userId == user_id).all()
+            return (await db.scalars(select(BiometricModel).where(BiometricModel.userId == user_id))).all()
 
-    def get_by_user_id_and_type(self, db: Session, user_id: UUID, data_type: str) -> List[BiometricModel]:
+    async def get_by_user_id_and_type(self, db: AsyncSession, user_id: UUID, data_type: str) -> List[BiometricModel]:
             """Obtiene registros biométricos de un usuario por el tipo de dato (ej. 'peso', 'talla')."""
-            return db.query(BiometricModel).filter(
+            return (await db.scalars(select(BiometricModel).where(
                 BiometricModel.userId == user_id,
                 BiometricModel.dataType == data_type
-            ).all()
+            ))).all()
 
-    def update(self, db: Session, biometric_id: UUID, biometric_update: BiometricUpdate) -> Optional[BiometricModel]:
+    async def update(self, db: AsyncSession, biometric_id: UUID, biometric_update: BiometricUpdate) -> Optional[BiometricModel]:
             """Actualiza un registro biométrico existente."""
-            db_biometric = self.get_by_id(db, biometric_id)
+            db_biometric = await self.get_by_id(db, biometric_id)
             if db_biometric:
                 # Itera sobre los campos que tienen un valor en el esquema de actualización
                 for key, value in biometric_update.model_dump(exclude_unset=True).items():
                     setattr(db_biometric, key, value)
-                db.commit()
-                db.refresh(db_biometric)
+                await db.commit()
+                await db.refresh(db_biometric)
             return db_biometric
 
 
-    def delete(self, db: Session, biometric_id: UUID ) -> BiometricModel:
+    async def delete(self, db: AsyncSession, biometric_id: UUID ) -> BiometricModel:
             """Elimina un registro biométrico por su ID."""
-            db_biometric = self.get_by_id(db, biometric_id)
+            db_biometric = await self.get_by_id(db, biometric_id)
             if db_biometric:
-                db.delete(db_biometric)
-                db.commit()
+                await db.delete(db_biometric)
+                await db.commit()
             return db_biometric
     
-    async def get_by_user_name(self, db: Session, user_name: str) -> List[BiometricRead]:
+    async def get_by_user_name(self, db: AsyncSession, user_name: str) -> List[BiometricRead]:
             """
             Obtiene todos los registros biométricos de un usuario buscando por su nombre.
             Orquesta la comunicación con el microservicio de autenticación.
@@ -70,6 +71,6 @@ class BiometricRepository:
             user_id = user_profile.get("id")
             
             # 2. El servicio usa el repositorio para obtener los datos con el ID ya resuelto.
-            return self.biometric_repository.get_by_user_id(db, user_id)
+            return await self.biometric_repository.get_by_user_id(db, user_id)
 
 
@@ -1,12 +1,13 @@
 # app/services/biometric_service.py
 from _pytest.logging import logging
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from app.domain.schemas.schemas import BiometricRead,BiometricBase,BiometricCreateData, BiometricUpdate,BiometricCreateRequest
 from app.repository.bometric_repo import BiometricRepository
 from app.servicies.user_service import get_user_by_username
+from app.core.security import TokenUser
 
 logger = logging.getLogger(__name__)
 
@@ -14,14 +15,19 @@ class BiometricService:
     def __init__(self, biometric_repository: BiometricRepository):
         self.biometric_repository = biometric_repository
 
-    async def create_new_record(self, db: Session, data: BiometricCreateRequest) -> BiometricRead:
-      
-        user = await get_user_by_username(data.username)
-        if not user:
-            raise ValueError(f"User with username '{data.username}' not found.")
+    async def create_new_record(
+        self, db: AsyncSession, data: BiometricCreateRequest, current_user: Optional[TokenUser] = None
+    ) -> BiometricRead:
+        # Si el token es del mismo usuario su id viene en los claims: no hace falta llamar a auth-service
+        user_id = current_user.id_for(data.username) if current_user else None
+        if user_id is None:
+            user = await get_user_by_username(data.username)
+            if not user:
+                raise ValueError(f"User with username '{data.username}' not found.")
+            user_id = user['id']
         
         biometric_data = BiometricCreateData(
-            userId=user['id'],
+            userId=user_id,
             username=data.username,
             peso=data.peso,
             talla=data.talla,
@@ -35,16 +41,16 @@ class BiometricService:
             biometric_data.imc = biometric_data.peso / (biometric_data.talla ** 2)
 
         logger.info(f"Procesando nuevo registro biométrico para el usuario: {data.username} (ID: {biometric_data.userId})")
-        db_biometric = self.biometric_repository.create(db, biometric_data)
+        db_biometric = await self.biometric_repository.create(db, biometric_data)
         
         return BiometricRead.model_validate(db_biometric)
         
        
 
-    def get_biometric_data_by_user(self, db: Session, user_id: UUID) -> List[BiometricRead]:
-        return self.biometric_repository.get_by_user_id(db, user_id)
+    async def get_biometric_data_by_user(self, db: AsyncSession, user_id: UUID) -> List[BiometricRead]:
+        return await self.biometric_repository.get_by_user_id(db, user_id)
 
-    async def get_by_user_name(self, db: Session, user_name: str) -> List[BiometricRead]:
+    async def get_by_user_name(self, db: AsyncSession, user_name: str) -> List[BiometricRead]:
         """
         Obtiene los registros biométricos de un usuario buscando por su nombre,
         usando la función importada.
@@ -54,18 +60,18 @@ class BiometricService:
             return None 
 
         user_id = user_profile.get("id")
-        return self.biometric_repository.get_by_user_id(db, user_id)
+        return await self.biometric_repository.get_by_user_id(db, user_id)
     
-    def analyze_progress(self, db: Session, user_id: UUID, data_type: str) -> Dict[str, Any]:
+    async def analyze_progress(self, db: AsyncSession, user_id: UUID, data_type: str) -> Dict[str, Any]:
         # ... (la lógica de análisis sigue igual)
         pass # Reemplaza con tu código de análisis
 
     
-    def update_record(self, db: Session, biometric_id: UUID, update_data: BiometricUpdate) ->BiometricRead:
+    async def update_record(self, db: AsyncSession, biometric_id: UUID, update_data: BiometricUpdate) ->BiometricRead:
         """
         Busca un registro biométrico por su ID, actualiza sus campos y lo guarda.
         """
-        db_biometric = self.biometric_repository.get_by_id(db, biometric_id)
+        db_biometric = await self.biometric_repository.get_by_id(db, biometric_id)
         if not db_biometric:
             return None
 
@@ -75,17 +81,17 @@ class BiometricService:
         for key, value in update_data_dict.items():
             setattr(db_biometric, key, value)
 
-        db.commit()
-        db.refresh(db_biometric)
+        await db.commit()
+        await db.refresh(db_biometric)
         return BiometricRead.model_validate(db_biometric)
 
 
-    def delete_record(self, db: Session, biometric_id: UUID) -> bool:
+    async def delete_record(self, db: AsyncSession, biometric_id: UUID) -> bool:
         # ... (código para eliminar un registro)
-        db_biometric = self.biometric_repository.get_by_id(db, biometric_id)
+        db_biometric = await self.biometric_repository.get_by_id(db, biometric_id)
         if not db_biometric:
             return False
 
-        db.delete(db_biometric)
-        db.commit()
+        await db.delete(db_biometric)
+        await db.commit()
         return True
\ No newline at end of file
@@ -0,0 +1,46 @@
+# services/http_client.py
+
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+# Un único cliente por proceso: reutiliza conexiones (keep-alive) en lugar de
+# abrir un socket nuevo en cada llamada a auth-service.
+_client: Optional[httpx.AsyncClient] = None
+
+
+def start_http_client() -> httpx.AsyncClient:
+    """Crea el cliente compartido. Se llama desde el lifespan de la aplicación."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=settings.AUTH_SERVICE_URL,
+            timeout=settings.HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            http2=settings.HTTP2_ENABLED,
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Cierra el cliente compartido y sus conexiones al apagar la aplicación."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Devuelve el cliente compartido, creándolo si el lifespan no lo hizo (p. ej. en scripts)."""
+    return _client if _client is not None else start_http_client()
+
+
+def request_timeout(timeout: Optional[float]):
+    """Timeout para una llamada concreta; None usa el del cliente."""
+    return httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
@@ -1,14 +1,17 @@
 # services/user_client.py
 
+from typing import Optional
+
 import httpx
 from fastapi import HTTPException
 
-AUTH_SERVICE_URL = "http://auth-service:8001"  # Usa el puerto interno expuesto por el container del auth-service
+from app.servicies.http_client import get_http_client, request_timeout
+
 
-async def validate_user_exists(user_id: str):
+async def validate_user_exists(user_id: str, timeout: Optional[float] = None):
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{AUTH_SERVICE_URL}/users/{user_id}")
+        client = get_http_client()
+        response = await client.get(f"/users/{user_id}", timeout=request_timeout(timeout))
         
         if response.status_code == 404:
             raise HTTPException(status_code=404, detail="User not found")
@@ -22,14 +25,14 @@ async def validate_user_exists(user_id: str):
         raise HTTPException(status_code=503, detail=f"User service not available: {e}")
 
 
-async def get_user_by_username(username: str):
+async def get_user_by_username(username: str, timeout: Optional[float] = None):
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{AUTH_SERVICE_URL}/users/by-username/{username}")
+        client = get_http_client()
+        response = await client.get(f"/users/by-username/{username}", timeout=request_timeout(timeout))
         if response.status_code == 404:
             raise HTTPException(status_code=404, detail="User not found")
         elif response.status_code != 200:
             raise HTTPException(status_code=response.status_code, detail="Error from auth service")
         return response.json()
     except httpx.RequestError as e:
-        raise HTTPException(status_code=503, detail=f"User service not available: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=503, detail=f"User service not available: {e}")
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.repository import  crud_exercise as crud_session
-from app.domain.schemas.schemas_exercise import ExerciseCreate, ExerciseRead
+from app.domain.schemas.schemas_exercise import (
+    ExerciseCreate, ExerciseRead, ExerciseTypeSearchPage, PersonalRecordRead,
+)
+from app.services import exercise_search, records_service
 from app.domain.schemas.schema_sesssion import ExerciseSessionCreate, ExerciseSessionRead
 
 
 
 
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="/sessions", tags=["Sessions"])
 
@@ -20,35 +25,64 @@ router = APIRouter(prefix="/sessions", tags=["Sessions"])
 
 
 @router.get("/exercises", response_model=List[ExerciseRead])
-def get_all_exercises(db: Session = Depends(get_db)):
-    return crud_session.get_all_exercises(db)
+async def get_all_exercises(db: AsyncSession = Depends(get_db)):
+    return await crud_session.get_all_exercises(db)
+
+# Antes de /exercises/{exercise_id}: "search" no es un UUID y daría 422
+@router.get("/exercises/search", response_model=ExerciseTypeSearchPage)
+async def search_exercises(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Búsqueda aproximada en el catálogo de ejercicios por nombre y descripción,
+    sin distinguir mayúsculas ni acentos. Resultados por similitud, paginados.
+    """
+    # Se pide uno de más para saber si hay página siguiente
+    matches = await exercise_search.search_exercise_types(db, q, limit + 1, offset)
+    return ExerciseTypeSearchPage(
+        items=[vars(match) for match in matches[:limit]],
+        next_offset=offset + limit if len(matches) > limit else None,
+    )
 
 @router.get("/exercises/{exercise_id}", response_model=ExerciseRead)
-def get_exercise(exercise_id: int, db: Session = Depends(get_db)):
-    exercise = crud_session.get_exercise(db, exercise_id)
+async def get_exercise(exercise_id: UUID, db: AsyncSession = Depends(get_db)):
+    exercise = await crud_session.get_exercise(db, exercise_id)
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found")
     return exercise
 
 @router.get("/{session_id}/exercises", response_model=List[ExerciseRead])
-def get_exercises_by_session(session_id: str, db: Session = Depends(get_db)):
-    return crud_session.get_exercises_by_session(db, session_id)
+async def get_exercises_by_session(session_id: UUID, db: AsyncSession = Depends(get_db)):
+    return await crud_session.get_exercises_by_session(db, session_id)
 
 
 
 @router.get("/by-username/{username}/exercises", response_model=List[ExerciseRead])
-async def get_exercises_by_username(username: str, db: Session = Depends(get_db)):
-    return await crud_session.get_exercises_by_username(db, username)
+async def get_exercises_by_username(
+    username: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db)
+):
+    return await crud_session.get_exercises_by_username(db, username, date_from, date_to, limit)
 
 
-@router.get("/exercises", response_model=List[ExerciseRead])
-def get_all_exercises(db: Session = Depends(get_db)):
-    return crud_session.get_all_exercises(db)
+@router.get("/by-username/{username}/records", response_model=List[PersonalRecordRead])
+async def get_personal_records_by_username(username: str, db: AsyncSession = Depends(get_db)):
+    """
+    Mejores marcas del usuario por ejercicio: peso, 1RM estimado (Epley),
+    distancia y duración.
+    """
+    return await records_service.get_records_by_username(db, username)
 
 
 
 @router.post("/exercises", response_model=ExerciseRead, status_code=status.HTTP_201_CREATED)
-async def create_new_exercise(exercise_data: ExerciseCreate, db: Session = Depends(get_db)):
+async def create_new_exercise(exercise_data: ExerciseCreate, db: AsyncSession = Depends(get_db)):
 
     try:
        
@@ -65,7 +99,7 @@ async def delete_exercise_by_info(
     username: str,
     name_session: str,
     name_exercise: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Elimina un ejercicio a partir de los datos proporcionados.
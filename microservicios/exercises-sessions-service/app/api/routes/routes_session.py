@@ -1,49 +1,194 @@
-from fastapi import APIRouter, Depends, HTTPException,status
-from sqlalchemy.orm import Session
+import base64
+import binascii
+import math
+from typing import Literal, Union
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.repository.crud_session import SessionRepository
+from app.core.security import TokenUser, get_optional_token_user
+from app.repository.crud_session import SessionRepository, stream_sessions_ndjson
+from app.services import analytics_service, export_service
+from app.domain.schemas.schemas_analytics import TrainingLoadDay, TrainingLoadRead
 from app.domain.schemas.schema_sesssion import (
     ExerciseSessionCreate, 
     ExerciseSessionRead, 
-    ExerciseSessionDelete
+    ExerciseSessionPage,
+    ExerciseSessionDelete,
+    WorkoutCreate
 
 )
-from typing import List
+from typing import List, Optional
 from app.domain.schemas.schemas_exercise import ExerciseCreate, ExerciseRead
 router = APIRouter(prefix="/sessions", tags=["Sessions"])
 
 
-def get_session_repository(db: Session = Depends(get_db)):
+def get_session_repository(db: AsyncSession = Depends(get_db)):
     """Dependency to get a SessionRepository instance."""
     return SessionRepository(db)
 
+
+def include_exercises(
+    include: Optional[str] = Query(
+        None, description="Relaciones a incluir, separadas por comas (p. ej. 'exercises')"
+    )
+) -> bool:
+    """Dependency: True si la petición pide los ejercicios de cada sesión."""
+    return include is not None and "exercises" in include.split(",")
+
+
+def _encode_cursor(session_id: UUID) -> str:
+    return base64.urlsafe_b64encode(session_id.bytes).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> UUID:
+    try:
+        return UUID(bytes=base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
 # -------------------------
 # Session endpoints
 # -------------------------
 @router.get("/by-username/{username}/sessions", response_model=List[ExerciseSessionRead])
 async def get_sessions_by_username(
     username: str, 
-    session_repo: SessionRepository = Depends(get_session_repository)
+    session_repo: SessionRepository = Depends(get_session_repository),
+    with_exercises: bool = Depends(include_exercises)
 ) -> List[ExerciseSessionRead]:
  
-    return await session_repo.get_sessions_by_username(username)
+    return await session_repo.get_sessions_by_username(username, with_exercises)
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else float(value)
+
+
+@router.get("/by-username/{username}/training-load", response_model=TrainingLoadRead)
+async def get_training_load_by_username(
+    username: str,
+    metric: analytics_service.Metric = "volume",
+    days: int = Query(28, ge=1, le=3660, description="Días devueltos, terminando hoy"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Carga de entrenamiento diaria del usuario con carga aguda (7 días),
+    crónica (28 días), ACWR y monotonía. La métrica puede ser volumen
+    (peso × repeticiones × series), duración o distancia.
+    """
+    training_load = await analytics_service.get_training_load(db, username, metric)
+    response = TrainingLoadRead(
+        username=username,
+        metric=metric,
+        acute_window_days=analytics_service.ACUTE_WINDOW_DAYS,
+        chronic_window_days=analytics_service.CHRONIC_WINDOW_DAYS,
+    )
+    if training_load is None:
+        return response
+
+    first = max(len(training_load.load) - days, 0)
+    response.days = [
+        TrainingLoadDay(
+            date=(training_load.start + i).item(),
+            load=training_load.load[i],
+            acute=training_load.acute[i],
+            chronic=training_load.chronic[i],
+            acwr=_optional(training_load.acwr[i]),
+            monotony=_optional(training_load.monotony[i]),
+        )
+        for i in range(first, len(training_load.load))
+    ]
+    return response
+
+
+@router.get("/by-username/{username}/export")
+async def export_history_by_username(
+    username: str,
+    format: export_service.ExportFormat = "csv",
+    gzip: bool = False,
+):
+    """
+    Exporta en streaming todo el historial del usuario, una fila por
+    ejercicio con los datos de su sesión, en CSV o NDJSON. Con `gzip=true`
+    se envía comprimido (application/gzip).
+    """
+    filename = f"training-history.{format}"
+    media_type = export_service.MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        export_service.stream_history(username, format, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 
-@router.get("/", response_model=List[ExerciseSessionRead])
+@router.get("/", response_model=ExerciseSessionPage)
 async def get_all_sessionset_all_sessions_with_usernames(
-    session_repo: SessionRepository = Depends(get_session_repository)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    format: Literal["json", "ndjson"] = "json",
+    session_repo: SessionRepository = Depends(get_session_repository),
+    with_exercises: bool = Depends(include_exercises)
 ):
-   
-    return await session_repo.get_all_sessions_with_usernames()
+    """
+    Lista las sesiones paginadas por cursor (`next_cursor` de la respuesta anterior).
+    Con `format=ndjson` devuelve en streaming todas las sesiones a partir del
+    cursor, una por línea, sin cargarlas en memoria.
+    """
+    after_id = _decode_cursor(cursor) if cursor else None
+
+    if format == "ndjson":
+        return StreamingResponse(
+            stream_sessions_ndjson(with_exercises, after_id),
+            media_type="application/x-ndjson",
+        )
+
+    # Se pide un elemento extra para saber si hay una página siguiente
+    sessions = await session_repo.get_all_sessions_with_usernames(
+        with_exercises, after_id=after_id, limit=limit + 1
+    )
+    next_cursor = None
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        next_cursor = _encode_cursor(sessions[-1].id)
+    return ExerciseSessionPage(items=sessions, next_cursor=next_cursor)
 
 @router.post("/", response_model=ExerciseSessionRead, status_code=status.HTTP_201_CREATED)
 async def create_session(
     session_data: ExerciseSessionCreate,
-    session_repo: SessionRepository = Depends(get_session_repository)
+    session_repo: SessionRepository = Depends(get_session_repository),
+    current_user: Optional[TokenUser] = Depends(get_optional_token_user)
 ):
-    """Crea una nueva sesión de ejercicio a partir del nombre de usuario."""
-    return await session_repo.create_session(session_data)
+    """
+    Crea una nueva sesión de ejercicio a partir del nombre de usuario.
+    Si el token Bearer pertenece a ese usuario, su id se toma del token.
+    """
+    return await session_repo.create_session(session_data, current_user)
+
+
+@router.post(
+    "/bulk",
+    response_model=Union[ExerciseSessionRead, List[ExerciseSessionRead]],
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_workouts(
+    workouts: Union[WorkoutCreate, List[WorkoutCreate]],
+    session_repo: SessionRepository = Depends(get_session_repository),
+    current_user: Optional[TokenUser] = Depends(get_optional_token_user)
+):
+    """
+    Crea una sesión con todos sus ejercicios en una sola transacción.
+    También acepta una lista de sesiones (sincronización de clientes offline);
+    la respuesta tiene la misma forma que el cuerpo enviado.
+    """
+    if isinstance(workouts, list):
+        return await session_repo.create_workouts(workouts, current_user)
+    created = await session_repo.create_workouts([workouts], current_user)
+    return created[0]
 
 
 @router.delete("/", response_model=dict)
@@ -10,4 +10,43 @@ class Settings:
     # Si estás en desarrollo local sin Docker Compose, usaría localhost:5433 o localhost:5432
     # Pero dentro de Docker Compose, el nombre del servicio es clave.
 
+    # Misma clave y algoritmo que auth-service: permite validar sus JWT localmente
+    SECRET_KEY: str = os.getenv("SECRET_KEY", "8b2b7bd1ea2fc45d4fc8c7068a1d3f20316f487b807f3ab1118f063605079174")
+    ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
+
+    # Cliente HTTP compartido para llamar a auth-service
+    AUTH_SERVICE_URL: str = os.getenv("AUTH_SERVICE_URL", "http://auth-service:8001")
+    HTTP_TIMEOUT_SECONDS: float = float(os.getenv("HTTP_TIMEOUT_SECONDS", "5.0"))
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    # httpcore cierra las conexiones libres en cuanto el pool supera este número:
+    # por debajo de HTTP_MAX_CONNECTIONS, con más llamadas a la vez no se reutilizan
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", os.getenv("HTTP_MAX_CONNECTIONS", "100")))
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+
+    # Caché username -> usuario de auth-service (tamaño 0 la desactiva)
+    USER_CACHE_MAX_SIZE: int = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+    USER_CACHE_TTL_SECONDS: float = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    # Los 404 se cachean menos tiempo para que un alta nueva se vea pronto
+    USER_CACHE_NEGATIVE_TTL_SECONDS: float = float(os.getenv("USER_CACHE_NEGATIVE_TTL_SECONDS", "5"))
+
+    # Agrupación de búsquedas de usuarios por id (UserLoader)
+    # No debe superar USER_BATCH_MAX_SIZE de auth-service
+    USER_LOADER_MAX_BATCH_SIZE: int = int(os.getenv("USER_LOADER_MAX_BATCH_SIZE", "500"))
+    USER_LOADER_MAX_CONCURRENCY: int = int(os.getenv("USER_LOADER_MAX_CONCURRENCY", "10"))
+
+    # Filas leídas por bloque del cursor de servidor en los listados en streaming
+    STREAM_CHUNK_SIZE: int = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+
+    # Caché de las series de carga de entrenamiento (se invalida con cada escritura del usuario;
+    # el TTL acota lo que tarda en verse una escritura hecha por otro proceso)
+    ANALYTICS_CACHE_MAX_SIZE: int = int(os.getenv("ANALYTICS_CACHE_MAX_SIZE", "1000"))
+    ANALYTICS_CACHE_TTL_SECONDS: float = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "300"))
+
+    # Caché en memoria nombre normalizado -> tipo de ejercicio del catálogo
+    EXERCISE_CATALOG_CACHE_MAX_SIZE: int = int(os.getenv("EXERCISE_CATALOG_CACHE_MAX_SIZE", "10000"))
+
+    # Búsqueda de ejercicios: similitud mínima (como pg_trgm.word_similarity_threshold)
+    EXERCISE_SEARCH_THRESHOLD: float = float(os.getenv("EXERCISE_SEARCH_THRESHOLD", "0.5"))
+
 settings = Settings()
\ No newline at end of file
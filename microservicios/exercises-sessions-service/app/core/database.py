@@ -1,23 +1,43 @@
  # app/core/database.py
 import os
-from typing import Generator
+from typing import AsyncGenerator
 from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlmodel import create_engine, Session, SQLModel
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# Driver asíncrono para cada dialecto; se acepta la misma URL síncrona de siempre
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Traduce una URL síncrona (postgresql://...) a su driver asíncrono."""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+engine = create_async_engine(async_database_url(DATABASE_URL))
+
+# expire_on_commit=False: tras el commit los objetos se siguen leyendo sin
+# volver a la base de datos (en asyncio no hay cargas implícitas)
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
 # 1. Reintroduce la clase Base de SQLAlchemy
 Base = declarative_base()
 
-def create_db_and_tables():
-    # Usa el metadata de SQLModel para crear las tablas
-    SQLModel.metadata.create_all(engine)
+async def create_db_and_tables():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
 
-def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
-        yield session
\ No newline at end of file
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with SessionLocal() as session:
+        yield session
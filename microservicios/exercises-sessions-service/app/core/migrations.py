@@ -0,0 +1,119 @@
+# app/core/migrations.py
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Misma normalización que app.services.exercise_catalog: espacios recortados y colapsados
+_DISPLAY_NAME = r"btrim(regexp_replace(name_exercise, '\s+', ' ', 'g'))"
+
+
+def _column_exists(table: str, column: str) -> str:
+    return (
+        "EXISTS (SELECT 1 FROM information_schema.columns "
+        f"WHERE table_schema = current_schema() AND table_name = '{table}' AND column_name = '{column}')"
+    )
+
+
+# Extensiones que necesitan los índices del modelo: se crean antes que las tablas
+EXTENSIONS = [
+    # Índice GIN de trigramas para la búsqueda de ejercicios
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+]
+
+# create_all crea las tablas que faltan pero no modifica las existentes.
+# Estas sentencias llevan las bases de datos creadas con versiones anteriores
+# al esquema actual; son idempotentes y se ejecutan en cada arranque.
+MIGRATIONS = [
+    # Username denormalizado en las sesiones
+    "ALTER TABLE exercise_sessions ADD COLUMN IF NOT EXISTS username VARCHAR",
+    "CREATE INDEX IF NOT EXISTS ix_exercise_sessions_username_name_session "
+    "ON exercise_sessions (username, name_session)",
+    # Índices compuestos para las búsquedas por usuario y por sesión
+    "CREATE INDEX IF NOT EXISTS ix_exercise_sessions_user_id_name_session "
+    "ON exercise_sessions (user_id, name_session)",
+    # Resumen por sesión; los valores de las filas existentes los calcula app.jobs.backfill
+    "ALTER TABLE exercise_sessions ADD COLUMN IF NOT EXISTS total_volume DOUBLE PRECISION NOT NULL DEFAULT 0",
+    "ALTER TABLE exercise_sessions ADD COLUMN IF NOT EXISTS total_duration DOUBLE PRECISION NOT NULL DEFAULT 0",
+    "ALTER TABLE exercise_sessions ADD COLUMN IF NOT EXISTS total_distance DOUBLE PRECISION NOT NULL DEFAULT 0",
+    "ALTER TABLE exercise_sessions ADD COLUMN IF NOT EXISTS exercise_count INTEGER NOT NULL DEFAULT 0",
+    # Catálogo de ejercicios: exercise_types la crea create_all. Los nombres
+    # repetidos de exercises se deduplican en el catálogo, cada fila pasa a
+    # referenciarlo y name_exercise desaparece. La descripción de la fila solo
+    # se conserva si difiere de la del catálogo.
+    "ALTER TABLE exercises ADD COLUMN IF NOT EXISTS exercise_type_id INTEGER REFERENCES exercise_types (id)",
+    f"""
+    DO $$
+    BEGIN
+        IF {_column_exists("exercises", "name_exercise")} THEN
+            INSERT INTO exercise_types (name, normalized_name, description)
+            SELECT DISTINCT ON (normalized_name) name, normalized_name, description
+            FROM (
+                SELECT {_DISPLAY_NAME} AS name, lower({_DISPLAY_NAME}) AS normalized_name, description
+                FROM exercises
+            ) AS named
+            ORDER BY normalized_name, description NULLS LAST
+            ON CONFLICT (normalized_name) DO NOTHING;
+
+            UPDATE exercises SET exercise_type_id = exercise_types.id
+            FROM exercise_types
+            WHERE exercises.exercise_type_id IS NULL
+              AND exercise_types.normalized_name = lower({_DISPLAY_NAME});
+
+            UPDATE exercises SET description = NULL
+            FROM exercise_types
+            WHERE exercise_types.id = exercises.exercise_type_id
+              AND exercises.description = exercise_types.description;
+
+            ALTER TABLE exercises DROP COLUMN name_exercise;
+        END IF;
+    END $$
+    """,
+    "ALTER TABLE exercises ALTER COLUMN exercise_type_id SET NOT NULL",
+    "CREATE INDEX IF NOT EXISTS ix_exercises_session_id_exercise_type_id "
+    "ON exercises (session_id, exercise_type_id)",
+    # personal_records pasa a indexarse por tipo de ejercicio: se reconstruye
+    f"""
+    DO $$
+    BEGIN
+        IF {_column_exists("personal_records", "name_exercise")} THEN
+            DROP TABLE personal_records;
+            CREATE TABLE personal_records (
+                user_id UUID NOT NULL,
+                exercise_type_id INTEGER NOT NULL REFERENCES exercise_types (id),
+                best_weight DOUBLE PRECISION,
+                best_e1rm DOUBLE PRECISION,
+                best_distance DOUBLE PRECISION,
+                best_duration DOUBLE PRECISION,
+                PRIMARY KEY (user_id, exercise_type_id)
+            );
+            INSERT INTO personal_records
+            SELECT exercise_sessions.user_id, exercises.exercise_type_id,
+                   max(exercises.weight),
+                   max(CASE WHEN exercises.reps > 0 THEN exercises.weight * (1 + exercises.reps / 30.0) END),
+                   max(exercises.distance),
+                   max(exercises.duration)
+            FROM exercises JOIN exercise_sessions ON exercises.session_id = exercise_sessions.id
+            GROUP BY exercise_sessions.user_id, exercises.exercise_type_id;
+        END IF;
+    END $$
+    """,
+    # Búsqueda por trigramas; search_text de los tipos existentes lo rellena app.jobs.backfill
+    "ALTER TABLE exercise_types ADD COLUMN IF NOT EXISTS search_text VARCHAR",
+    "CREATE INDEX IF NOT EXISTS ix_exercise_types_search_text_trgm "
+    "ON exercise_types USING gin (search_text gin_trgm_ops)",
+]
+
+
+async def create_extensions(conn: AsyncConnection) -> None:
+    """Crea EXTENSIONS en la transacción de `conn`. Solo aplica a PostgreSQL."""
+    if conn.dialect.name != "postgresql":
+        return
+    for statement in EXTENSIONS:
+        await conn.execute(text(statement))
+
+
+async def run_migrations(conn: AsyncConnection) -> None:
+    """Aplica MIGRATIONS en la transacción de `conn`. Solo aplica a PostgreSQL."""
+    if conn.dialect.name != "postgresql":
+        return
+    for statement in MIGRATIONS:
+        await conn.execute(text(statement))
@@ -0,0 +1,73 @@
+# app/core/security.py
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+
+# Solo se usa para leer el encabezado Authorization; el token lo emite auth-service
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/token", auto_error=False)
+
+
+class TokenUser(BaseModel):
+    """Usuario autenticado, reconstruido a partir de los claims del JWT."""
+    username: str
+    user_id: Optional[UUID] = None
+    roles: List[str] = []
+
+    def id_for(self, username: str) -> Optional[UUID]:
+        """
+        Devuelve el id del usuario si el token pertenece a `username`.
+        Los tokens emitidos antes de incluir el claim `uid` devuelven None.
+        """
+        if self.username == username:
+            return self.user_id
+        return None
+
+
+def decode_access_token(token: str) -> Optional[TokenUser]:
+    """Valida la firma y la expiración del token. Devuelve None si no es válido."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        username = payload.get("sub")
+        if not username:
+            return None
+        return TokenUser(
+            username=username,
+            user_id=payload.get("uid"),
+            roles=payload.get("roles") or [],
+        )
+    except (JWTError, ValidationError):
+        return None
+
+
+def get_optional_token_user(token: Optional[str] = Depends(oauth2_scheme)) -> Optional[TokenUser]:
+    """
+    Dependencia: el usuario del token Bearer, o None si la petición no trae token.
+    Un token presente pero inválido se rechaza con 401.
+    """
+    if token is None:
+        return None
+    user = decode_access_token(token)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+def get_token_user(user: Optional[TokenUser] = Depends(get_optional_token_user)) -> TokenUser:
+    """Dependencia: igual que get_optional_token_user pero exige el token."""
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
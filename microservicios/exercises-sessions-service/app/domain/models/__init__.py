@@ -1 +1 @@
-from .models import Exercise, ExerciseSession
\ No newline at end of file
+from .models import Exercise, ExerciseSession, ExerciseType, PersonalRecord
\ No newline at end of file
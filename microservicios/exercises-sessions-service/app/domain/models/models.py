@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, Date
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, Date, Index, case, func
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -12,12 +13,52 @@ class ExerciseSession(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), nullable=False)
+    # Copia del username de auth-service para responder lecturas sin llamarlo.
+    # Tras un renombrado la repara app.jobs.reconcile_usernames.
+    username = Column(String, nullable=True)
     date = Column(Date, default=datetime.utcnow().date)  # Día de la sesión
     name_session= Column(String, nullable=True)  # Día de la sesión
+
+    # Resumen de los ejercicios de la sesión, mantenido al añadir o borrar ejercicios
+    # (los recalcula app.jobs.backfill)
+    total_volume = Column(Float, nullable=False, default=0, server_default="0")
+    total_duration = Column(Float, nullable=False, default=0, server_default="0")
+    total_distance = Column(Float, nullable=False, default=0, server_default="0")
+    exercise_count = Column(Integer, nullable=False, default=0, server_default="0")
     
 
     exercises = relationship("Exercise", back_populates="session", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_exercise_sessions_username_name_session", "username", "name_session"),
+        Index("ix_exercise_sessions_user_id_name_session", "user_id", "name_session"),
+    )
+
+
+class ExerciseType(Base):
+    """
+    Catálogo de ejercicios. Cada nombre distinto (sin distinguir mayúsculas
+    ni espacios) se guarda una sola vez; los ejercicios lo referencian por id.
+    """
+    __tablename__ = "exercise_types"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)  # Primera forma en que se escribió
+    normalized_name = Column(String, nullable=False, unique=True)
+    description = Column(String, nullable=True)
+    # Nombre y descripción sin acentos ni mayúsculas, para la búsqueda por trigramas
+    # (lo rellena la aplicación; ver app.services.exercise_catalog.search_text_for)
+    search_text = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_exercise_types_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
+
 
 class Exercise(Base):
     __tablename__ = "exercises"
@@ -25,8 +66,9 @@ class Exercise(Base):
     exercise_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey("exercise_sessions.id"), nullable=False)
 
-    name_exercise = Column(String, nullable=False)
-    description = Column(String, nullable=True)
+    exercise_type_id = Column(Integer, ForeignKey("exercise_types.id"), nullable=False)
+    # Solo se guarda si difiere de la descripción del catálogo
+    description_override = Column("description", String, nullable=True)
 
     weight = Column(Float, nullable=True)
     reps = Column(Integer, nullable=True)
@@ -35,3 +77,64 @@ class Exercise(Base):
     distance = Column(Float, nullable=True)
 
     session = relationship("ExerciseSession", back_populates="exercises")
+    # many-to-one: se trae en la misma consulta que el ejercicio
+    exercise_type = relationship("ExerciseType", lazy="joined", innerjoin=True)
+
+    # También sirve para las búsquedas solo por session_id (FK y borrado en cascada)
+    __table_args__ = (
+        Index("ix_exercises_session_id_exercise_type_id", "session_id", "exercise_type_id"),
+    )
+
+    @property
+    def name_exercise(self) -> str:
+        return self.exercise_type.name
+
+    @property
+    def description(self) -> str | None:
+        if self.description_override is not None:
+            return self.description_override
+        return self.exercise_type.description
+
+    @hybrid_property
+    def volume(self) -> float:
+        """Tonelaje: peso × repeticiones × series (sin series cuenta como una)."""
+        series = 1 if self.series is None else self.series
+        return (self.weight or 0) * (self.reps or 0) * series
+
+    @volume.expression
+    def volume(cls):
+        return func.coalesce(cls.weight, 0) * func.coalesce(cls.reps, 0) * func.coalesce(cls.series, 1)
+
+    @hybrid_property
+    def e1rm(self) -> float | None:
+        """1RM estimado con la fórmula de Epley: peso × (1 + repeticiones / 30)."""
+        if self.weight is None or not self.reps:
+            return None
+        return self.weight * (1 + self.reps / 30)
+
+    @e1rm.expression
+    def e1rm(cls):
+        return case((cls.reps > 0, cls.weight * (1 + cls.reps / 30.0)))
+
+
+class PersonalRecord(Base):
+    """
+    Mejores marcas de un usuario por ejercicio. Se actualiza al añadir
+    ejercicios y se recalcula al borrar el que tenía la marca; la reconstruye
+    app.jobs.backfill.
+    """
+    __tablename__ = "personal_records"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    exercise_type_id = Column(Integer, ForeignKey("exercise_types.id"), primary_key=True)
+
+    best_weight = Column(Float, nullable=True)
+    best_e1rm = Column(Float, nullable=True)
+    best_distance = Column(Float, nullable=True)
+    best_duration = Column(Float, nullable=True)
+
+    exercise_type = relationship("ExerciseType", lazy="joined", innerjoin=True)
+
+    @property
+    def name_exercise(self) -> str:
+        return self.exercise_type.name
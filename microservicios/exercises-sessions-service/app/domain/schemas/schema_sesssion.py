@@ -28,9 +28,36 @@ class ExerciseSessionRead(ExerciseSessionBase):
     exercises: List[ExerciseRead] = []
     username: Optional[str] = None
     name_session: Optional[str] = None  
+    total_volume: float = 0
+    total_duration: float = 0
+    total_distance: float = 0
+    exercise_count: int = 0
 
     model_config = ConfigDict(from_attributes=True)
 
+class WorkoutExerciseCreate(BaseModel):
+    name_exercise: str
+    description: Optional[str] = None
+    weight: Optional[float] = None
+    reps: Optional[int] = None
+    series: Optional[int] = None
+    duration: Optional[float] = None
+    distance: Optional[float] = None
+
+
+class WorkoutCreate(ExerciseSessionBase):
+    # Una sesión completa con sus ejercicios, para POST /sessions/bulk
+    username: str
+    name_session: Optional[str] = None
+    exercises: List[WorkoutExerciseCreate] = []
+
+
+class ExerciseSessionPage(BaseModel):
+    items: List[ExerciseSessionRead]
+    # Cursor opaco para pedir la página siguiente; None en la última página
+    next_cursor: Optional[str] = None
+
+
 class ExerciseSessionDelete(ExerciseSessionBased):
     username: str
     name_session: str 
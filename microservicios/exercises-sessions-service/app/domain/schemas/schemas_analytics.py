@@ -0,0 +1,21 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class TrainingLoadDay(BaseModel):
+    date: date
+    load: float
+    acute: float
+    chronic: float
+    # None cuando no hay carga crónica o la de la semana es constante
+    acwr: Optional[float] = None
+    monotony: Optional[float] = None
+
+
+class TrainingLoadRead(BaseModel):
+    username: str
+    metric: str
+    acute_window_days: int
+    chronic_window_days: int
+    days: List[TrainingLoadDay] = []
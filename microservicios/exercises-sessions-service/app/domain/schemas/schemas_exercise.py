@@ -56,4 +56,28 @@ class ExerciseDelete(ExerciseBase):
     name_session: str
     username: str
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PersonalRecordRead(BaseModel):
+    name_exercise: str
+    best_weight: Optional[float] = None
+    best_e1rm: Optional[float] = None
+    best_distance: Optional[float] = None
+    best_duration: Optional[float] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ExerciseTypeSearchResult(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    # Similitud con la consulta, de 0 a 1
+    score: float
+
+
+class ExerciseTypeSearchPage(BaseModel):
+    items: List[ExerciseTypeSearchResult] = []
+    # Offset de la página siguiente; None si no hay más resultados
+    next_offset: Optional[int] = None
@@ -0,0 +1,114 @@
+# app/jobs/backfill.py
+"""
+Recalcula los datos derivados de los ejercicios:
+
+- las columnas de resumen de exercise_sessions (total_volume,
+  total_duration, total_distance, exercise_count);
+- la tabla personal_records;
+- exercise_types.search_text de los tipos creados antes de la búsqueda.
+
+Necesario una vez tras añadir las columnas o la tabla y útil para corregir
+cualquier desviación de las actualizaciones incrementales. Uso:
+
+    python -m app.jobs.backfill
+"""
+import asyncio
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import SessionLocal, engine
+from app.domain.models.models import Exercise, ExerciseSession, ExerciseType, PersonalRecord
+from app.services.exercise_catalog import search_text_for
+
+
+def _sum_of_exercises(expression):
+    """Subconsulta correlacionada: suma de `expression` sobre los ejercicios de la sesión."""
+    return (
+        select(func.coalesce(func.sum(expression), 0))
+        .where(Exercise.session_id == ExerciseSession.id)
+        .scalar_subquery()
+    )
+
+
+async def backfill_session_totals(db: AsyncSession) -> int:
+    """Recalcula el resumen de todas las sesiones en un solo UPDATE. Devuelve las filas afectadas."""
+    result = await db.execute(
+        update(ExerciseSession)
+        .values(
+            total_volume=_sum_of_exercises(Exercise.volume),
+            total_duration=_sum_of_exercises(func.coalesce(Exercise.duration, 0)),
+            total_distance=_sum_of_exercises(func.coalesce(Exercise.distance, 0)),
+            exercise_count=(
+                select(func.count(Exercise.exercise_id))
+                .where(Exercise.session_id == ExerciseSession.id)
+                .scalar_subquery()
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def backfill_personal_records(db: AsyncSession) -> int:
+    """Reconstruye personal_records con un INSERT ... SELECT agregado. Devuelve las marcas creadas."""
+    records = (
+        select(
+            ExerciseSession.user_id,
+            Exercise.exercise_type_id,
+            func.max(Exercise.weight),
+            func.max(Exercise.e1rm),
+            func.max(Exercise.distance),
+            func.max(Exercise.duration),
+        )
+        .join(ExerciseSession, Exercise.session_id == ExerciseSession.id)
+        .group_by(ExerciseSession.user_id, Exercise.exercise_type_id)
+    )
+    await db.execute(delete(PersonalRecord))
+    result = await db.execute(
+        insert(PersonalRecord).from_select(
+            ["user_id", "exercise_type_id", "best_weight", "best_e1rm", "best_distance", "best_duration"],
+            records,
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def backfill_search_text(db: AsyncSession) -> int:
+    """
+    Rellena search_text donde falta. La normalización (sin acentos) se hace en
+    Python, igual que al crear los tipos. Devuelve los tipos actualizados.
+    """
+    rows = (await db.execute(
+        select(ExerciseType.id, ExerciseType.name, ExerciseType.description)
+        .where(ExerciseType.search_text.is_(None))
+    )).all()
+    if rows:
+        table = ExerciseType.__table__
+        await db.execute(
+            update(table)
+            .where(table.c.id == bindparam("type_id"))
+            .values(search_text=bindparam("text")),
+            [{"type_id": row.id, "text": search_text_for(row.name, row.description)} for row in rows],
+        )
+    await db.commit()
+    return len(rows)
+
+
+async def main() -> None:
+    try:
+        async with SessionLocal() as db:
+            updated = await backfill_session_totals(db)
+            records = await backfill_personal_records(db)
+            search_texts = await backfill_search_text(db)
+        print(f"Sesiones recalculadas: {updated}")
+        print(f"Marcas personales: {records}")
+        print(f"Textos de búsqueda: {search_texts}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
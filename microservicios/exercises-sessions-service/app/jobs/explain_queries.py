@@ -0,0 +1,105 @@
+# app/jobs/explain_queries.py
+"""
+Comprueba con EXPLAIN que las consultas de los repositorios usan índices.
+
+Se ejecuta contra una base PostgreSQL con el esquema actual (por ejemplo la
+de docker-compose) y termina con código 1 si alguna consulta hace un
+Seq Scan sobre las tablas del servicio. Uso:
+
+    python -m app.jobs.explain_queries
+
+Dentro de la transacción se desactiva enable_seqscan: el planificador solo
+recurre a un Seq Scan cuando no hay ningún índice utilizable, así que el
+resultado no depende de cuántas filas tengan las tablas.
+"""
+import asyncio
+import json
+import sys
+import uuid
+from datetime import date
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import literal, select, text
+from sqlalchemy.sql import Select
+
+from app.core.database import engine
+from app.domain.models.models import Exercise, ExerciseSession, ExerciseType
+
+_USER_ID = uuid.uuid4()
+_SESSION_ID = uuid.uuid4()
+
+# Las mismas consultas que lanzan crud_session, crud_exercise y session_service
+QUERIES: Dict[str, Select] = {
+    "sessions_by_username": select(ExerciseSession).where(ExerciseSession.username == "user"),
+    "session_by_username_and_name": select(ExerciseSession).where(
+        ExerciseSession.username == "user", ExerciseSession.name_session == "session"
+    ),
+    "sessions_by_user_id": select(ExerciseSession).where(ExerciseSession.user_id == _USER_ID),
+    "session_by_user_id_and_name": select(ExerciseSession).where(
+        ExerciseSession.user_id == _USER_ID, ExerciseSession.name_session == "session"
+    ),
+    "sessions_page": select(ExerciseSession)
+    .where(ExerciseSession.id > _SESSION_ID)
+    .order_by(ExerciseSession.id)
+    .limit(100),
+    "exercises_by_session": select(Exercise).where(Exercise.session_id == _SESSION_ID),
+    "exercise_by_session_and_type": select(Exercise).where(
+        Exercise.session_id == _SESSION_ID, Exercise.exercise_type_id == 1
+    ),
+    "exercise_type_by_name": select(ExerciseType).where(ExerciseType.normalized_name == "exercise"),
+    # Misma condición que app.services.exercise_search (índice GIN de trigramas)
+    "exercise_type_search": select(ExerciseType).where(
+        literal("exercise").op("<%")(ExerciseType.search_text) | ExerciseType.search_text.like("%exercise%")
+    ),
+    "exercises_by_username": select(Exercise)
+    .join(ExerciseSession, Exercise.session_id == ExerciseSession.id)
+    .where(ExerciseSession.username == "user", ExerciseSession.date >= date(2000, 1, 1))
+    .order_by(ExerciseSession.date, ExerciseSession.id),
+}
+
+_TABLES = {ExerciseSession.__tablename__, Exercise.__tablename__, ExerciseType.__tablename__}
+
+
+def _seq_scans(plan: Dict[str, Any]) -> Iterator[str]:
+    """Tablas del servicio recorridas con Seq Scan en un plan (recursivo)."""
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in _TABLES:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+async def explain_queries() -> Dict[str, List[str]]:
+    """Devuelve, por consulta, las tablas que se leen con Seq Scan."""
+    if engine.dialect.name != "postgresql":
+        raise RuntimeError("EXPLAIN checks require PostgreSQL")
+
+    results = {}
+    async with engine.connect() as conn:
+        await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, statement in QUERIES.items():
+            sql = statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+            raw = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar_one()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            results[name] = list(_seq_scans(plan))
+        await conn.rollback()
+    return results
+
+
+async def main() -> int:
+    try:
+        results = await explain_queries()
+    finally:
+        await engine.dispose()
+
+    failed = False
+    for name, tables in results.items():
+        if tables:
+            failed = True
+            print(f"FAIL {name}: Seq Scan on {', '.join(tables)}")
+        else:
+            print(f"ok   {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,59 @@
+# app/jobs/reconcile_usernames.py
+"""
+Repara la columna `username` de exercise_sessions a partir de auth-service.
+
+Rellena las sesiones creadas antes de que existiera la columna y corrige las
+de usuarios renombrados. Uso:
+
+    python -m app.jobs.reconcile_usernames
+"""
+import asyncio
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import SessionLocal, engine
+from app.domain.models.models import ExerciseSession
+from app.services.http_client import close_http_client, start_http_client
+from app.services.user_loader import UserLoader
+
+
+async def reconcile_session_usernames(db: AsyncSession) -> int:
+    """Actualiza las sesiones cuyo username no coincide con el de auth-service. Devuelve las filas cambiadas."""
+    user_ids = (await db.scalars(select(ExerciseSession.user_id).distinct())).all()
+    if not user_ids:
+        return 0
+
+    users = await UserLoader().load_many(user_ids)
+
+    updated = 0
+    for user_id, user in zip(user_ids, users):
+        # Usuarios borrados en auth-service: se conservan los datos tal cual
+        if user is None:
+            continue
+        result = await db.execute(
+            update(ExerciseSession)
+            .where(
+                ExerciseSession.user_id == user_id,
+                or_(ExerciseSession.username.is_(None), ExerciseSession.username != user["username"]),
+            )
+            .values(username=user["username"])
+        )
+        updated += result.rowcount
+    await db.commit()
+    return updated
+
+
+async def main() -> None:
+    start_http_client()
+    try:
+        async with SessionLocal() as db:
+            updated = await reconcile_session_usernames(db)
+        print(f"Sesiones actualizadas: {updated}")
+    finally:
+        await close_http_client()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,7 +4,12 @@ from typing import AsyncGenerator
 from fastapi import FastAPI
 from app.api.routes import routes_exercise, routes_session
 from app.core.database import engine
+from app.core.migrations import create_extensions, run_migrations
 from app.domain.models.models import Base
+from app.services.http_client import start_http_client, close_http_client
+from app.services.analytics_service import training_load_cache
+from app.services.exercise_catalog import exercise_catalog
+from app.services.user_client import user_by_username_cache
 
 # Esta función se ejecutará al iniciar la aplicación y al detenerla.
 # Es el lugar ideal para inicializar recursos como la base de datos.
@@ -16,13 +21,29 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     - Se ejecuta después de que la aplicación termina de procesar solicitudes.
     """
     print("Creando tablas de la base de datos...")
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await create_extensions(conn)
+        await conn.run_sync(Base.metadata.create_all)
+        await run_migrations(conn)
+    start_http_client()
     yield
     print("Cerrando la aplicación...")
+    await close_http_client()
+    await engine.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
 
 # Incluir rutas de API
 app.include_router(routes_exercise.router)
-app.include_router(routes_session.router)
\ No newline at end of file
+app.include_router(routes_session.router)
+
+
+@app.get("/stats", tags=["Root"])
+def read_stats():
+    """Contadores de las cachés en memoria de este proceso."""
+    return {
+        "user_by_username_cache": user_by_username_cache.stats(),
+        "training_load_cache": training_load_cache.stats(),
+        "exercise_catalog": exercise_catalog.stats(),
+    }
@@ -1,11 +1,13 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.domain.models.models import Exercise, ExerciseSession
 from app.domain.schemas.schemas_exercise import ExerciseCreate, ExerciseRead
 from app.domain.schemas.schema_sesssion import ExerciseSessionCreate, ExerciseSessionRead
 # Importa los esquemas de sesión desde el archivo de sesiones
 
+from datetime import date
 from typing import List, Optional
-from app.services.user_client import  get_user_by_username
+from uuid import UUID
 from app.services.session_service import add_exercise_to_session, delete_exercise_by_attributes
 
 
@@ -15,37 +17,50 @@ from app.services.session_service import add_exercise_to_session, delete_exercis
 # CRUD - Exercise
 # ---------------------
 
-async def create_exercise(db: Session, exercise_data: ExerciseCreate) -> Exercise:
+async def create_exercise(db: AsyncSession, exercise_data: ExerciseCreate) -> Exercise:
   
     new_exercise = await add_exercise_to_session(db, exercise_data)
     
     return new_exercise
 
 
-def get_all_exercises(db: Session) -> List[ExerciseRead]:
-    return db.query(Exercise).all()
+async def get_all_exercises(db: AsyncSession) -> List[ExerciseRead]:
+    return (await db.scalars(select(Exercise))).all()
 
 
-def get_exercises_by_session(db: Session, session_id: str) -> List[Exercise]:
-    return db.query(Exercise).filter(Exercise.session_id == session_id).all()
+async def get_exercises_by_session(db: AsyncSession, session_id: UUID) -> List[Exercise]:
+    return (await db.scalars(select(Exercise).where(Exercise.session_id == session_id))).all()
 
 
-def get_exercise(db: Session, exercise_id: str) -> Optional[Exercise]:
-    return db.query(Exercise).filter(Exercise.id == exercise_id).first()
+async def get_exercise(db: AsyncSession, exercise_id: UUID) -> Optional[Exercise]:
+    return await db.get(Exercise, exercise_id)
 
-async def get_exercises_by_username(db: Session, username: str) -> List[ExerciseRead]:
-    user_data = await get_user_by_username(username)
-    user_id = user_data["id"]
-    sessions = db.query(ExerciseSession).filter(ExerciseSession.user_id == user_id).all()
-    exercises = []
-    for session in sessions:
-        session_exercises = db.query(Exercise).filter(Exercise.session_id == session.id).all()
-        for exercise in session_exercises:
-            exercise_schema = ExerciseRead.model_validate(exercise)
-            exercises.append(exercise_schema)
-    return exercises
+async def get_exercises_by_username(
+    db: AsyncSession,
+    username: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: Optional[int] = None,
+) -> List[Exercise]:
+    """
+    Ejercicios de todas las sesiones del usuario en una sola consulta (JOIN),
+    ordenados por fecha de sesión y opcionalmente acotados por fechas y límite.
+    """
+    query = (
+        select(Exercise)
+        .join(ExerciseSession, Exercise.session_id == ExerciseSession.id)
+        .where(ExerciseSession.username == username)
+    )
+    if date_from is not None:
+        query = query.where(ExerciseSession.date >= date_from)
+    if date_to is not None:
+        query = query.where(ExerciseSession.date <= date_to)
+    query = query.order_by(ExerciseSession.date, ExerciseSession.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return (await db.scalars(query)).all()
 
 
-async def delete_exercise(db: Session, username: str, name_session: str, name_exercise: str) -> bool:
+async def delete_exercise(db: AsyncSession, username: str, name_session: str, name_exercise: str) -> bool:
  
     return await delete_exercise_by_attributes(db, username, name_session, name_exercise)
\ No newline at end of file
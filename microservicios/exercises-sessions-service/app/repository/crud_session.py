@@ -1,16 +1,26 @@
 import asyncio
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
 import uuid
 from app.services.user_client import get_user_by_username, validate_user_exists
-from sqlmodel import Session, select
+from app.core.security import TokenUser
+from app.services.user_loader import UserLoader
+from app.core.config import settings
+from app.core.database import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload, selectinload
 from app.domain.models.models import Exercise, ExerciseSession
 from app.domain.schemas.schema_sesssion import (
     ExerciseSessionCreate, 
     ExerciseSessionRead,
     ExerciseSessionUpdate,
-    ExerciseSessionDelete
+    ExerciseSessionDelete,
+    WorkoutCreate
 )
+from app.services import session_service
+from app.services.analytics_service import invalidate_training_load
+from app.services.records_service import recompute_records
 from app.services.user_client import get_user_by_username, validate_user_exists
 from fastapi import Depends, HTTPException
 
@@ -18,27 +28,73 @@ from fastapi import Depends, HTTPException
 # Repositorio de Sesiones de Ejercicio
 # ---------------------
 
+def _exercises_loading(include_exercises: bool):
+    """
+    Estrategia de carga de ExerciseSession.exercises para los listados:
+    selectinload trae los ejercicios de todas las sesiones en una segunda
+    consulta (2 en total en lugar de 1 + N); noload los omite por completo.
+    """
+    if include_exercises:
+        return selectinload(ExerciseSession.exercises)
+    return noload(ExerciseSession.exercises)
+
+
+async def stream_sessions_ndjson(
+    include_exercises: bool = False, after_id: Optional[UUID] = None
+) -> AsyncIterator[bytes]:
+    """
+    Serializa todas las sesiones como NDJSON (una por línea) a medida que se
+    leen de un cursor de servidor en bloques de STREAM_CHUNK_SIZE filas, de
+    modo que la memoria no crece con el tamaño de la tabla.
+
+    Abre su propia sesión de base de datos: la de la dependencia get_db ya
+    está cerrada cuando la respuesta empieza a enviarse.
+    """
+    statement = (
+        select(ExerciseSession)
+        .order_by(ExerciseSession.id)
+        .options(_exercises_loading(include_exercises))
+        .execution_options(yield_per=settings.STREAM_CHUNK_SIZE)
+    )
+    if after_id is not None:
+        statement = statement.where(ExerciseSession.id > after_id)
+
+    async with SessionLocal() as db:
+        result = await db.stream_scalars(statement)
+        async for chunk in result.partitions():
+            yield b"".join(
+                ExerciseSessionRead.model_validate(session).model_dump_json().encode() + b"\n"
+                for session in chunk
+            )
+            # Las sesiones ya enviadas no se vuelven a necesitar
+            db.expunge_all()
+
+
 class SessionRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_session(self, session_data: ExerciseSessionCreate) -> ExerciseSessionRead:
-    # 1. Obtener el user_id a partir del username
-        user_data = await get_user_by_username(session_data.username)
-        if not user_data:
-            raise HTTPException(status_code=404, detail=f"User with username '{session_data.username}' not found.")
-    
-        user_id = UUID(user_data["id"])
+    async def create_session(
+        self, session_data: ExerciseSessionCreate, current_user: Optional[TokenUser] = None
+    ) -> ExerciseSessionRead:
+    # 1. Obtener el user_id: del token si es del mismo usuario, si no de auth-service
+        user_id = current_user.id_for(session_data.username) if current_user else None
+        if user_id is None:
+            user_data = await get_user_by_username(session_data.username)
+            if not user_data:
+                raise HTTPException(status_code=404, detail=f"User with username '{session_data.username}' not found.")
+            user_id = UUID(user_data["id"])
 
     # 2. Crear la sesión usando el user_id obtenido
         db_session = ExerciseSession(
         user_id=user_id,
+        username=session_data.username,
         date=session_data.date,
-        name_session=session_data.name_session
+        name_session=session_data.name_session,
+        exercises=[]
     )
         self.db.add(db_session)
-        self.db.commit()
-        self.db.refresh(db_session)
+        await self.db.commit()
 
     # 3. Preparar la respuesta con el username
     # Corrección para Pydantic v2:
@@ -47,77 +103,100 @@ class SessionRepository:
         response_schema.username = session_data.username
     
         return response_schema
+
+    async def create_workouts(
+        self, workouts: List[WorkoutCreate], current_user: Optional[TokenUser] = None
+    ) -> List[ExerciseSessionRead]:
+        """Crea sesiones completas (con ejercicios) en una sola transacción."""
+        return await session_service.create_workouts(self.db, workouts, current_user)
     
 
-    async def get_all_sessions_with_usernames(self) -> List[ExerciseSessionRead]:
-        sessions = self.db.exec(select(ExerciseSession)).all()
+    async def get_all_sessions_with_usernames(
+        self,
+        include_exercises: bool = False,
+        after_id: Optional[UUID] = None,
+        limit: Optional[int] = None,
+    ) -> List[ExerciseSessionRead]:
+        """
+        Lista sesiones ordenadas por id. Con `after_id` y `limit` devuelve una
+        página (paginación por keyset sobre la clave primaria).
+        """
+        statement = (
+            select(ExerciseSession)
+            .order_by(ExerciseSession.id)
+            .options(_exercises_loading(include_exercises))
+        )
+        if after_id is not None:
+            statement = statement.where(ExerciseSession.id > after_id)
+        if limit is not None:
+            statement = statement.limit(limit)
+        sessions = (await self.db.scalars(statement)).all()
         
         if not sessions:
             return []
 
-        tasks = [validate_user_exists(str(session.user_id)) for session in sessions]
-        user_data_list = await asyncio.gather(*tasks)
+        # Solo las sesiones anteriores a la columna `username` (aún sin reconciliar)
+        # necesitan consultar auth-service
+        missing = [session for session in sessions if session.username is None]
+        usernames = {}
+        if missing:
+            user_loader = UserLoader()
+            user_data_list = await user_loader.load_many(session.user_id for session in missing)
+            usernames = {
+                session.id: user_data.get("username", "Unknown") if user_data else "Unknown"
+                for session, user_data in zip(missing, user_data_list)
+            }
 
         session_list = []
-        for session, user_data in zip(sessions, user_data_list):
-            username = user_data.get("username", "Unknown") if user_data else "Unknown"
+        for session in sessions:
             session_read = ExerciseSessionRead.model_validate(session)
-            session_read.username = username
+            if session.username is None:
+                session_read.username = usernames[session.id]
             session_list.append(session_read)
 
         return session_list
     
     
 
-    async def get_sessions_by_username(self, username: str) -> List[ExerciseSessionRead]:
-        # 1. Obtener datos del usuario
-        user_data = await get_user_by_username(username)
-        if not user_data:
-            return []
-    
-        user_id = uuid.UUID(user_data["id"])
-        
-        sessions = self.db.exec(
-            select(ExerciseSession).where(ExerciseSession.user_id == user_id)
-        ).all()
-     
-        session_list = []
-        for session in sessions:
-            session_read = ExerciseSessionRead.model_validate(session)
-            session_read.username = username
-            session_list.append(session_read)            
-        return session_list
+    async def get_sessions_by_username(
+        self, username: str, include_exercises: bool = False
+    ) -> List[ExerciseSessionRead]:
+        sessions = (await self.db.scalars(
+            select(ExerciseSession)
+            .where(ExerciseSession.username == username)
+            .options(_exercises_loading(include_exercises))
+        )).all()
+        return [ExerciseSessionRead.model_validate(session) for session in sessions]
     
 
 
     
     async def delete_session(self, session_data: ExerciseSessionDelete) -> bool:
-        # 1. Obtener el user_id a partir del username
-        user_data = await get_user_by_username(session_data.username)
-        if not user_data:
-            raise HTTPException(status_code=404, detail=f"User with username '{session_data.username}' not found.")
-        
-        user_id = uuid.UUID(user_data["id"])
-        
-
-        session_to_delete = self.db.exec(
+        session_to_delete = (await self.db.scalars(
             select(ExerciseSession).where(
-                ExerciseSession.user_id == user_id,
+                ExerciseSession.username == session_data.username,
                 ExerciseSession.name_session == session_data.name_session
             )
-        ).first()
+        )).first()
 
         if not session_to_delete:
             raise HTTPException(status_code=404, detail="Session not found.")
         
         
         try:
-            self.db.delete(session_to_delete)
-            self.db.commit() # Confirma la transacción
+            await self.db.delete(session_to_delete)
+            # Las marcas de los ejercicios borrados en cascada se recalculan
+            await recompute_records(
+                self.db,
+                session_to_delete.user_id,
+                {exercise.exercise_type_id for exercise in session_to_delete.exercises},
+            )
+            await self.db.commit() # Confirma la transacción
+            invalidate_training_load(session_data.username)
             return True
         except Exception as e:
            
-            self.db.rollback()
+            await self.db.rollback()
            
             print(f"Error al eliminar la sesión: {e}")
             return False 
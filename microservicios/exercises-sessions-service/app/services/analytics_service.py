@@ -0,0 +1,104 @@
+# services/analytics_service.py
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Literal
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.domain.models import ExerciseSession
+from app.services.user_cache import SingleFlightCache
+
+Metric = Literal["volume", "duration", "distance"]
+
+# Carga diaria por métrica: se suman las columnas de resumen de las sesiones del día
+METRIC_COLUMNS = {
+    "volume": ExerciseSession.total_volume,
+    "duration": ExerciseSession.total_duration,
+    "distance": ExerciseSession.total_distance,
+}
+
+ACUTE_WINDOW_DAYS = 7
+CHRONIC_WINDOW_DAYS = 28
+
+# Clave (username, métrica, día de cálculo); se invalida con cada escritura del usuario
+training_load_cache = SingleFlightCache(
+    max_size=settings.ANALYTICS_CACHE_MAX_SIZE,
+    ttl=settings.ANALYTICS_CACHE_TTL_SECONDS,
+    negative_ttl=0,
+)
+
+
+@dataclass(frozen=True)
+class TrainingLoad:
+    """Series diarias (una posición por día desde `start`) de carga y ventanas móviles."""
+    start: np.datetime64
+    load: np.ndarray
+    acute: np.ndarray
+    chronic: np.ndarray
+    acwr: np.ndarray
+    monotony: np.ndarray
+
+
+def _rolling_sum(cumulative: np.ndarray, window: int) -> np.ndarray:
+    """Suma móvil de `window` días a partir de la suma acumulada con un 0 inicial."""
+    shifted = np.concatenate((np.zeros(window), cumulative))[: len(cumulative)]
+    return (cumulative - shifted)[1:]
+
+
+def compute_training_load(dates: np.ndarray, loads: np.ndarray, end: date) -> TrainingLoad:
+    """
+    Carga diaria, carga aguda (media de 7 días), crónica (media de 28 días),
+    ACWR (aguda / crónica) y monotonía de Foster (media / desviación típica
+    de los últimos 7 días). Los días sin sesiones cuentan como carga 0; los
+    cocientes sin denominador son NaN.
+    """
+    start = dates[0]
+    days = (dates - start).astype(np.int64)
+    length = max(int((np.datetime64(end, "D") - start).astype(np.int64)) + 1, int(days[-1]) + 1)
+    daily = np.bincount(days, weights=loads, minlength=length)
+
+    cumulative = np.concatenate(([0.0], np.cumsum(daily)))
+    acute = _rolling_sum(cumulative, ACUTE_WINDOW_DAYS) / ACUTE_WINDOW_DAYS
+    chronic = _rolling_sum(cumulative, CHRONIC_WINDOW_DAYS) / CHRONIC_WINDOW_DAYS
+    # La desviación se calcula sobre vistas de 7 días (sin copias): con E[x²] - E[x]²
+    # sobre sumas acumuladas el redondeo daría desviaciones espurias en cargas constantes
+    padded = np.concatenate((np.zeros(ACUTE_WINDOW_DAYS - 1), daily))
+    std = np.lib.stride_tricks.sliding_window_view(padded, ACUTE_WINDOW_DAYS).std(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acwr = np.where(chronic > 0, acute / chronic, np.nan)
+        monotony = np.where(std > 0, acute / std, np.nan)
+
+    return TrainingLoad(start=start, load=daily, acute=acute, chronic=chronic, acwr=acwr, monotony=monotony)
+
+
+async def get_training_load(db: AsyncSession, username: str, metric: Metric) -> TrainingLoad | None:
+    """Serie de carga del usuario hasta hoy; None si no tiene sesiones. Cacheada hasta su próxima escritura."""
+    today = date.today()
+
+    async def load() -> TrainingLoad | None:
+        rows = (await db.execute(
+            select(ExerciseSession.date, func.sum(METRIC_COLUMNS[metric]))
+            .where(ExerciseSession.username == username, ExerciseSession.date.is_not(None))
+            .group_by(ExerciseSession.date)
+            .order_by(ExerciseSession.date)
+        )).all()
+        if not rows:
+            return None
+        dates, loads = zip(*rows)
+        return compute_training_load(
+            np.array(dates, dtype="datetime64[D]"), np.array(loads, dtype=np.float64), today
+        )
+
+    return await training_load_cache.get_or_load((username, metric, today), load)
+
+
+def invalidate_training_load(username: str) -> None:
+    """Descarta las series cacheadas de `username` tras una escritura suya."""
+    today = date.today()
+    for metric in METRIC_COLUMNS:
+        training_load_cache.invalidate((username, metric, today))
@@ -0,0 +1,148 @@
+# services/exercise_catalog.py
+
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.domain.models import ExerciseType
+
+
+def display_exercise_name(name: str) -> str:
+    """Nombre sin espacios al principio ni al final y con los intermedios colapsados."""
+    return " ".join(name.split())
+
+
+def normalize_exercise_name(name: str) -> str:
+    """Clave del catálogo: el nombre en minúsculas y con los espacios colapsados."""
+    return display_exercise_name(name).lower()
+
+
+def normalize_search_text(text: str) -> str:
+    """Texto comparable: sin acentos (NFKD sin marcas combinantes), en minúsculas y con los espacios colapsados."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).casefold().split())
+
+
+def search_text_for(name: str, description: Optional[str]) -> str:
+    """Valor de ExerciseType.search_text: nombre y descripción normalizados."""
+    return normalize_search_text(f"{name} {description or ''}")
+
+
+class ExerciseCatalog:
+    """
+    Interning de tipos de ejercicio: nombre normalizado -> ExerciseType.
+
+    Las entradas no cambian una vez creadas, así que se guardan sin TTL en
+    una LRU acotada. Los tipos nuevos se insertan en una transacción propia,
+    confirmada antes de cachearlos: si la petición que los pidió hace
+    rollback, el id cacheado sigue existiendo.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._types: "OrderedDict[str, ExerciseType]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, normalized_name: str) -> Optional[ExerciseType]:
+        exercise_type = self._types.get(normalized_name)
+        if exercise_type is not None:
+            self._types.move_to_end(normalized_name)
+        return exercise_type
+
+    def _store(self, row) -> ExerciseType:
+        exercise_type = ExerciseType(
+            id=row.id, name=row.name, normalized_name=row.normalized_name, description=row.description
+        )
+        # Objeto "detached": se incorpora a cada sesión con merge(load=False), sin consultas
+        make_transient_to_detached(exercise_type)
+        if self.max_size <= 0:
+            return exercise_type
+        self._types[row.normalized_name] = exercise_type
+        self._types.move_to_end(row.normalized_name)
+        while len(self._types) > self.max_size:
+            self._types.popitem(last=False)
+        return exercise_type
+
+    async def resolve(
+        self, db: AsyncSession, names: Iterable[Tuple[str, Optional[str]]]
+    ) -> Dict[str, ExerciseType]:
+        """
+        Devuelve, por nombre normalizado, el tipo de cada (nombre, descripción),
+        creando en una sola sentencia los que aún no existan
+        (INSERT ... ON CONFLICT DO NOTHING RETURNING). La descripción solo se
+        usa al crear el tipo.
+        """
+        wanted: Dict[str, Tuple[str, Optional[str]]] = {}
+        for name, description in names:
+            wanted.setdefault(normalize_exercise_name(name), (display_exercise_name(name), description))
+
+        resolved = {normalized: self._get(normalized) for normalized in wanted}
+        missing = [normalized for normalized, exercise_type in resolved.items() if exercise_type is None]
+        self.hits += len(wanted) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            columns = (ExerciseType.id, ExerciseType.name, ExerciseType.normalized_name, ExerciseType.description)
+            insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+            async with db.bind.begin() as conn:
+                rows = (await conn.execute(
+                    insert(ExerciseType)
+                    .values([
+                        {
+                            "name": wanted[normalized][0],
+                            "normalized_name": normalized,
+                            "description": wanted[normalized][1],
+                            "search_text": search_text_for(*wanted[normalized]),
+                        }
+                        for normalized in missing
+                    ])
+                    .on_conflict_do_nothing(index_elements=[ExerciseType.normalized_name])
+                    .returning(*columns)
+                )).all()
+                # Los que ya existían (o creó otra petición a la vez) no vuelven en RETURNING
+                created = {row.normalized_name for row in rows}
+                existing = [normalized for normalized in missing if normalized not in created]
+                if existing:
+                    rows += (await conn.execute(
+                        select(*columns).where(ExerciseType.normalized_name.in_(existing))
+                    )).all()
+            for row in rows:
+                resolved[row.normalized_name] = self._store(row)
+
+        return {
+            normalized: await db.merge(exercise_type, load=False)
+            for normalized, exercise_type in resolved.items()
+        }
+
+    async def resolve_one(self, db: AsyncSession, name: str, description: Optional[str] = None) -> ExerciseType:
+        return (await self.resolve(db, [(name, description)]))[normalize_exercise_name(name)]
+
+    async def lookup(self, db: AsyncSession, name: str) -> Optional[ExerciseType]:
+        """Tipo de un nombre si ya está en el catálogo, sin crearlo."""
+        normalized = normalize_exercise_name(name)
+        exercise_type = self._get(normalized)
+        if exercise_type is None:
+            self.misses += 1
+            row = (await db.execute(
+                select(ExerciseType.id, ExerciseType.name, ExerciseType.normalized_name, ExerciseType.description)
+                .where(ExerciseType.normalized_name == normalized)
+            )).first()
+            if row is None:
+                return None
+            exercise_type = self._store(row)
+        else:
+            self.hits += 1
+        return await db.merge(exercise_type, load=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._types), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+exercise_catalog = ExerciseCatalog(settings.EXERCISE_CATALOG_CACHE_MAX_SIZE)
@@ -0,0 +1,125 @@
+# services/exercise_search.py
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.domain.models import ExerciseType
+from app.services.exercise_catalog import normalize_search_text, search_text_for
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+@dataclass(frozen=True)
+class ExerciseTypeMatch:
+    id: int
+    name: str
+    description: Optional[str]
+    score: float
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas como los de pg_trgm: por palabra, con dos espacios delante y uno detrás."""
+    grams = set()
+    for word in _WORD.findall(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    Índice invertido trigrama -> tipos de ejercicio, en memoria. Sustituye al
+    índice GIN de pg_trgm cuando la base de datos no es PostgreSQL (SQLite en
+    desarrollo y pruebas).
+
+    La puntuación es la fracción de trigramas de la consulta presentes en el
+    texto: una aproximación de word_similarity() que coincide con ella cuando
+    la consulta aparece entera en el texto.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._types: Dict[int, ExerciseTypeMatch] = {}
+        self._texts: Dict[int, str] = {}
+        # Los tipos no cambian ni se borran: basta con leer los de id mayor
+        self.last_id = 0
+
+    def add(self, type_id: int, name: str, description: Optional[str], search_text: str) -> None:
+        self._types[type_id] = ExerciseTypeMatch(type_id, name, description, 0.0)
+        self._texts[type_id] = search_text
+        for gram in trigrams(search_text):
+            self._postings.setdefault(gram, set()).add(type_id)
+        self.last_id = max(self.last_id, type_id)
+
+    def search(self, query: str, threshold: float) -> List[ExerciseTypeMatch]:
+        """Tipos que superan `threshold` o contienen la consulta, de más a menos parecidos."""
+        query_grams = trigrams(query)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._postings.get(gram, ()))
+
+        # Como el LIKE de PostgreSQL, una subcadena coincide aunque no comparta trigramas
+        candidates = shared.keys() | {type_id for type_id, text in self._texts.items() if query in text}
+        matches = []
+        for type_id in candidates:
+            score = shared[type_id] / len(query_grams) if query_grams else 0.0
+            if score >= threshold or query in self._texts[type_id]:
+                match = self._types[type_id]
+                matches.append(ExerciseTypeMatch(match.id, match.name, match.description, score))
+        matches.sort(key=lambda match: (-match.score, match.name))
+        return matches
+
+
+fallback_index = TrigramIndex()
+
+
+async def _search_postgresql(db: AsyncSession, query: str, limit: int, offset: int) -> List[ExerciseTypeMatch]:
+    # <% (similitud por palabra sobre el umbral) y LIKE usan el índice GIN de trigramas
+    await db.execute(
+        select(func.set_config("pg_trgm.word_similarity_threshold", str(settings.EXERCISE_SEARCH_THRESHOLD), True))
+    )
+    pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    score = func.word_similarity(query, ExerciseType.search_text).label("score")
+    rows = (await db.execute(
+        select(ExerciseType.id, ExerciseType.name, ExerciseType.description, score)
+        .where(
+            literal(query).op("<%")(ExerciseType.search_text)
+            | ExerciseType.search_text.like(pattern, escape="\\")
+        )
+        .order_by(score.desc(), ExerciseType.name)
+        .limit(limit)
+        .offset(offset)
+    )).all()
+    return [ExerciseTypeMatch(row.id, row.name, row.description, row.score) for row in rows]
+
+
+async def _search_fallback(db: AsyncSession, query: str, limit: int, offset: int) -> List[ExerciseTypeMatch]:
+    # Incorpora al índice los tipos creados desde la última búsqueda
+    rows = (await db.execute(
+        select(ExerciseType.id, ExerciseType.name, ExerciseType.description, ExerciseType.search_text)
+        .where(ExerciseType.id > fallback_index.last_id)
+        .order_by(ExerciseType.id)
+    )).all()
+    for row in rows:
+        search_text = row.search_text or search_text_for(row.name, row.description)
+        fallback_index.add(row.id, row.name, row.description, search_text)
+    return fallback_index.search(query, settings.EXERCISE_SEARCH_THRESHOLD)[offset:offset + limit]
+
+
+async def search_exercise_types(db: AsyncSession, q: str, limit: int, offset: int = 0) -> List[ExerciseTypeMatch]:
+    """
+    Tipos de ejercicio del catálogo parecidos a `q` (sin distinguir
+    mayúsculas ni acentos), ordenados por similitud y después por nombre.
+    """
+    query = normalize_search_text(q)
+    if not query:
+        return []
+    if db.bind.dialect.name == "postgresql":
+        return await _search_postgresql(db, query, limit, offset)
+    return await _search_fallback(db, query, limit, offset)
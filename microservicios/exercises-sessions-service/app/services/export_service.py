@@ -0,0 +1,95 @@
+# services/export_service.py
+
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Iterable, Literal, Sequence
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.domain.models import Exercise, ExerciseSession, ExerciseType
+
+ExportFormat = Literal["csv", "ndjson"]
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Una fila por ejercicio; las sesiones sin ejercicios salen con esas columnas vacías
+_COLUMNS = (
+    ExerciseSession.id.label("session_id"),
+    ExerciseSession.date,
+    ExerciseSession.name_session,
+    Exercise.exercise_id,
+    ExerciseType.name.label("name_exercise"),
+    func.coalesce(Exercise.description_override, ExerciseType.description).label("description"),
+    Exercise.weight,
+    Exercise.reps,
+    Exercise.series,
+    Exercise.duration,
+    Exercise.distance,
+)
+FIELDS = [column.key for column in _COLUMNS]
+
+
+def _history_statement(username: str):
+    return (
+        select(*_COLUMNS)
+        .select_from(ExerciseSession)
+        .outerjoin(Exercise, Exercise.session_id == ExerciseSession.id)
+        .outerjoin(ExerciseType, ExerciseType.id == Exercise.exercise_type_id)
+        .where(ExerciseSession.username == username)
+        .order_by(ExerciseSession.date, ExerciseSession.id, Exercise.exercise_id)
+        .execution_options(yield_per=settings.STREAM_CHUNK_SIZE)
+    )
+
+
+def _csv_chunk(rows: Iterable[Sequence], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(FIELDS)
+    # Los None salen como campos vacíos; fechas y UUID como su str()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _ndjson_chunk(rows: Iterable[Sequence]) -> bytes:
+    return b"".join(
+        json.dumps(dict(zip(FIELDS, row)), default=str, ensure_ascii=False).encode() + b"\n"
+        for row in rows
+    )
+
+
+async def _history_chunks(username: str, format: ExportFormat) -> AsyncIterator[bytes]:
+    if format == "csv":
+        yield _csv_chunk((), header=True)
+    async with SessionLocal() as db:
+        # Filas de columnas (sin objetos ORM) leídas del cursor de servidor por bloques
+        result = await db.stream(_history_statement(username))
+        async for rows in result.partitions():
+            yield _csv_chunk(rows) if format == "csv" else _ndjson_chunk(rows)
+
+
+async def stream_history(username: str, format: ExportFormat, compress: bool = False) -> AsyncIterator[bytes]:
+    """
+    Historial completo de `username` (sesiones y ejercicios) en CSV o NDJSON,
+    serializado por bloques de STREAM_CHUNK_SIZE filas con memoria constante.
+    Con `compress` la salida es un flujo gzip.
+
+    Abre su propia sesión de base de datos: la de la dependencia get_db ya
+    está cerrada cuando la respuesta empieza a enviarse.
+    """
+    if not compress:
+        async for chunk in _history_chunks(username, format):
+            yield chunk
+        return
+
+    # wbits=31: cabecera y cola gzip
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in _history_chunks(username, format):
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
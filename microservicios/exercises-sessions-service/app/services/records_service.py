@@ -0,0 +1,135 @@
+# services/records_service.py
+
+from typing import Iterable, List
+from uuid import UUID
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+
+from app.domain.models import Exercise, ExerciseSession, ExerciseType, PersonalRecord
+
+# Marca -> valor del ejercicio del que sale
+_RECORD_FIELDS = {
+    "best_weight": lambda exercise: exercise.weight,
+    "best_e1rm": lambda exercise: exercise.e1rm,
+    "best_distance": lambda exercise: exercise.distance,
+    "best_duration": lambda exercise: exercise.duration,
+}
+
+_RECORD_EXPRESSIONS = {
+    "best_weight": Exercise.weight,
+    "best_e1rm": Exercise.e1rm,
+    "best_distance": Exercise.distance,
+    "best_duration": Exercise.duration,
+}
+
+
+def _max(*values):
+    present = [value for value in values if value is not None]
+    return max(present) if present else None
+
+
+def _insert(db: AsyncSession):
+    """INSERT con soporte de ON CONFLICT para el dialecto de la sesión."""
+    return pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+def _greatest(current, incoming):
+    # Como greatest() de PostgreSQL, ignorando NULL, pero portable
+    return case(
+        (incoming.is_(None), current),
+        (current.is_(None), incoming),
+        (incoming > current, incoming),
+        else_=current,
+    )
+
+
+async def record_exercises(db: AsyncSession, user_id: UUID, exercises: Iterable[Exercise]) -> None:
+    """
+    Actualiza las marcas de `user_id` con ejercicios nuevos: un upsert por
+    tipo de ejercicio que solo sube cada marca si la mejora.
+    """
+    best = {}
+    for exercise in exercises:
+        current = best.setdefault(exercise.exercise_type.id, dict.fromkeys(_RECORD_FIELDS))
+        for field, value_of in _RECORD_FIELDS.items():
+            current[field] = _max(current[field], value_of(exercise))
+    if not best:
+        return
+
+    insert = _insert(db)
+    statement = insert(PersonalRecord).values([
+        {"user_id": user_id, "exercise_type_id": exercise_type_id, **records}
+        for exercise_type_id, records in best.items()
+    ])
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[PersonalRecord.user_id, PersonalRecord.exercise_type_id],
+            set_={
+                field: _greatest(getattr(PersonalRecord, field), getattr(statement.excluded, field))
+                for field in _RECORD_FIELDS
+            },
+        )
+    )
+
+
+async def recompute_records(db: AsyncSession, user_id: UUID, exercise_type_ids: Iterable[int]) -> None:
+    """
+    Recalcula desde los ejercicios las marcas de `user_id` para esos tipos
+    (tras un borrado que pudo quitar la marca vigente). Las marcas sin
+    ejercicios restantes se eliminan.
+    """
+    exercise_type_ids = set(exercise_type_ids)
+    if not exercise_type_ids:
+        return
+
+    rows = (await db.execute(
+        select(
+            Exercise.exercise_type_id,
+            *(func.max(expression).label(field) for field, expression in _RECORD_EXPRESSIONS.items()),
+        )
+        .join(ExerciseSession, Exercise.session_id == ExerciseSession.id)
+        .where(ExerciseSession.user_id == user_id, Exercise.exercise_type_id.in_(exercise_type_ids))
+        .group_by(Exercise.exercise_type_id)
+    )).mappings().all()
+
+    await db.execute(
+        delete(PersonalRecord).where(
+            PersonalRecord.user_id == user_id, PersonalRecord.exercise_type_id.in_(exercise_type_ids)
+        )
+    )
+    if rows:
+        await db.execute(
+            _insert(db)(PersonalRecord).values([{"user_id": user_id, **row} for row in rows])
+        )
+
+
+def holds_record(record: PersonalRecord | None, exercise: Exercise) -> bool:
+    """True si `exercise` tiene alguna de las marcas vigentes de `record`."""
+    if record is None:
+        return False
+    return any(
+        value_of(exercise) is not None and value_of(exercise) >= getattr(record, field)
+        for field, value_of in _RECORD_FIELDS.items()
+        if getattr(record, field) is not None
+    )
+
+
+async def get_records_by_username(db: AsyncSession, username: str) -> List[PersonalRecord]:
+    """Marcas de un usuario, una fila por ejercicio (lectura por clave primaria)."""
+    user_id = (
+        select(ExerciseSession.user_id)
+        .where(ExerciseSession.username == username)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return (await db.scalars(
+        select(PersonalRecord)
+        .join(PersonalRecord.exercise_type)
+        .options(contains_eager(PersonalRecord.exercise_type))
+        .where(PersonalRecord.user_id == user_id)
+        .order_by(ExerciseType.name)
+    )).all()
@@ -1,64 +1,127 @@
 # services/session_service.py
 
-from sqlalchemy.orm import Session
-from app.domain.models import ExerciseSession as SessionModel, Exercise
-from app.domain.schemas.schema_sesssion import ExerciseSession
+import asyncio
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import TokenUser
+from app.domain.models import ExerciseSession as SessionModel, Exercise, ExerciseType, PersonalRecord
+from app.domain.schemas.schema_sesssion import ExerciseSession, ExerciseSessionRead, WorkoutCreate
 from app.domain.schemas.schemas_exercise import ExerciseCreate, ExerciseRead
+from app.services.analytics_service import invalidate_training_load
+from app.services.exercise_catalog import exercise_catalog, normalize_exercise_name
+from app.services.records_service import holds_record, record_exercises, recompute_records
 from app.services.user_client import validate_user_exists,get_user_by_username
 
-async def create_session(db: Session, session_data: ExerciseCreate) -> SessionModel:
+def _session_totals(exercises: List[Exercise], sign: int = 1) -> dict:
+    """Aportación de `exercises` a las columnas de resumen de su sesión (sign=-1 para restarla)."""
+    return {
+        "total_volume": sign * sum(exercise.volume for exercise in exercises),
+        "total_duration": sign * sum(exercise.duration or 0 for exercise in exercises),
+        "total_distance": sign * sum(exercise.distance or 0 for exercise in exercises),
+        "exercise_count": sign * len(exercises),
+    }
+
+
+async def _increment_session_totals(db: AsyncSession, session_id: UUID, totals: dict) -> None:
+    """Suma `totals` al resumen de la sesión con un UPDATE atómico (x = x + :v)."""
+    await db.execute(
+        update(SessionModel)
+        .where(SessionModel.id == session_id)
+        .values({
+            getattr(SessionModel, column): getattr(SessionModel, column) + value
+            for column, value in totals.items()
+        })
+        .execution_options(synchronize_session=False)
+    )
 
-    # Validamos si el usuario existe antes de crear la sesión
-    await validate_user_exists(session_data.user_id)
 
-    session = SessionModel(
-        user_id=session_data.user_id,
-        name_session=session_data.name_session  # Asegúrate de pasar el nombre
+def _build_exercise(exercise_data, exercise_type: ExerciseType, **fields) -> Exercise:
+    """Ejercicio que referencia su tipo del catálogo; la descripción solo se guarda si difiere de la de este."""
+    description = exercise_data.description
+    return Exercise(
+        exercise_type=exercise_type,
+        description_override=description if description != exercise_type.description else None,
+        weight=exercise_data.weight,
+        reps=exercise_data.reps,
+        series=exercise_data.series,
+        duration=exercise_data.duration,
+        distance=exercise_data.distance,
+        **fields,
     )
 
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-
-    # Creamos los ejercicios asociados a la sesión
-    for exercise_data in session_data.exercises:
-        exercise = Exercise(
-            name_exercise=exercise_data.name_exercise,
-            description=exercise_data.description,
-            weight=exercise_data.weight,
-            reps=exercise_data.reps,
-            series=exercise_data.series,
-            duration=exercise_data.duration,
-            distance=exercise_data.distance,
-            session_id=session.id
-        )
-        db.add(exercise)
 
-    db.commit()
-    db.refresh(session)
-    return session
+async def create_workouts(
+    db: AsyncSession, workouts: List[WorkoutCreate], current_user: Optional[TokenUser] = None
+) -> List[ExerciseSessionRead]:
+    """
+    Crea varias sesiones con todos sus ejercicios en una única transacción:
+    los INSERT se agrupan en un solo flush y se confirma una sola vez.
+    """
+    # Un usuario por username distinto: del token si es el suyo, si no de auth-service (cacheado)
+    usernames = list(dict.fromkeys(workout.username for workout in workouts))
+
+    async def resolve_user_id(username: str) -> UUID:
+        user_id = current_user.id_for(username) if current_user else None
+        if user_id is None:
+            user_data = await get_user_by_username(username)
+            user_id = UUID(user_data["id"])
+        return user_id
+
+    user_ids = dict(zip(usernames, await asyncio.gather(*(resolve_user_id(u) for u in usernames))))
+    exercise_types = await exercise_catalog.resolve(db, (
+        (exercise.name_exercise, exercise.description) for workout in workouts for exercise in workout.exercises
+    ))
+
+    sessions = []
+    for workout in workouts:
+        session = SessionModel(
+            user_id=user_ids[workout.username],
+            username=workout.username,
+            date=workout.date,
+            name_session=workout.name_session,
+            exercises=[
+                _build_exercise(exercise, exercise_types[normalize_exercise_name(exercise.name_exercise)])
+                for exercise in workout.exercises
+            ],
+        )
+        # Sesiones nuevas: el resumen se calcula directamente
+        for column, value in _session_totals(session.exercises).items():
+            setattr(session, column, value)
+        sessions.append(session)
+
+    db.add_all(sessions)
+    for user_id in set(user_ids.values()):
+        await record_exercises(db, user_id, (
+            exercise for session in sessions if session.user_id == user_id for exercise in session.exercises
+        ))
+    await db.flush()
+    # La respuesta se construye antes del commit para no recargar cada sesión después
+    created = [ExerciseSessionRead.model_validate(session) for session in sessions]
+    await db.commit()
+    for username in usernames:
+        invalidate_training_load(username)
+    return created
 
 
 ## Funciones de lógica de negocio y búsqueda
 
-async def get_session_by_username_and_name(db: Session, username: str, name_session: str) -> SessionModel | None:
+async def get_session_by_username_and_name(db: AsyncSession, username: str, name_session: str) -> SessionModel | None:
 
-    # 1. Obtener el user_id del otro servicio (auth-service)
-    user_id = await get_user_by_username(username)
-    
-    if not user_id:
-        return None
-    user_id = user_id['id']
-    # 2. Buscar la sesión en la base de datos local usando el user_id
-    session = db.query(SessionModel).filter(
-        SessionModel.user_id == user_id,
-        SessionModel.name_session == name_session
-    ).first()
+    # El username está denormalizado en la sesión: no hace falta consultar auth-service
+    session = (await db.scalars(
+        select(SessionModel).where(
+            SessionModel.username == username,
+            SessionModel.name_session == name_session
+        )
+    )).first()
     
     return session
 
 
-async def add_exercise_to_session(db: Session, exercise_data: ExerciseCreate) -> Exercise:
+async def add_exercise_to_session(db: AsyncSession, exercise_data: ExerciseCreate) -> Exercise:
   
     # Usar la función de servicio para encontrar la sesión correcta
     session = await get_session_by_username_and_name(db, exercise_data.username, exercise_data.name_session)
@@ -66,49 +129,59 @@ async def add_exercise_to_session(db: Session, exercise_data: ExerciseCreate) ->
     if not session:
         raise ValueError("Session not found for the given user and session name.")
         
-    # Crear la instancia del modelo Exercise, solo con los campos que pertenecen
-    exercise = Exercise(
-        name_exercise=exercise_data.name_exercise,
-        description=exercise_data.description,
-        weight=exercise_data.weight,
-        reps=exercise_data.reps,
-        series=exercise_data.series,
-        duration=exercise_data.duration,
-        distance=exercise_data.distance,
+    # El nombre se resuelve contra el catálogo (caché en memoria o un único INSERT ... ON CONFLICT)
+    exercise_type = await exercise_catalog.resolve_one(db, exercise_data.name_exercise, exercise_data.description)
+    exercise = _build_exercise(
+        exercise_data,
+        exercise_type,
         session_id=session.id  # Asignamos el ID de la sesión encontrada
     )
     
     db.add(exercise)
-    db.commit()
-    db.refresh(exercise)
+    await _increment_session_totals(db, session.id, _session_totals([exercise]))
+    await record_exercises(db, session.user_id, [exercise])
+    await db.commit()
+    invalidate_training_load(exercise_data.username)
     
     return exercise
 
 
-def get_sessions_by_user(db: Session, user_id: str) -> list[SessionModel]:
+async def get_sessions_by_user(db: AsyncSession, user_id: UUID) -> list[SessionModel]:
 
-    return db.query(SessionModel).filter(SessionModel.user_id == user_id).all()
+    return (await db.scalars(select(SessionModel).where(SessionModel.user_id == user_id))).all()
 
-def get_session(db: Session, session_id: int) -> SessionModel | None:
+async def get_session(db: AsyncSession, session_id: UUID) -> SessionModel | None:
    
-    return db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    return await db.get(SessionModel, session_id)
 
-async def delete_exercise_by_attributes(db: Session, username: str, name_session: str, name_exercise: str) -> bool:
+async def delete_exercise_by_attributes(db: AsyncSession, username: str, name_session: str, name_exercise: str) -> bool:
     # 1. Encontrar la sesión correcta
     session = await get_session_by_username_and_name(db, username, name_session)
     
     if not session:
         return False 
+
+    exercise_type = await exercise_catalog.lookup(db, name_exercise)
+    if not exercise_type:
+        return False
     
-    to_delete = db.query(Exercise).filter(
-        Exercise.session_id == session.id,
-        Exercise.name_exercise == name_exercise
-    ).first()
+    to_delete = (await db.scalars(
+        select(Exercise).where(
+            Exercise.session_id == session.id,
+            Exercise.exercise_type_id == exercise_type.id
+        )
+    )).first()
 
    
     if to_delete:
-        db.delete(to_delete)
-        db.commit()
+        record = await db.get(PersonalRecord, (session.user_id, exercise_type.id))
+        await db.delete(to_delete)
+        await _increment_session_totals(db, session.id, _session_totals([to_delete], sign=-1))
+        # Solo hace falta recalcular si el ejercicio borrado tenía alguna marca
+        if holds_record(record, to_delete):
+            await recompute_records(db, session.user_id, [exercise_type.id])
+        await db.commit()
+        invalidate_training_load(username)
         return True
     
     return False
\ No newline at end of file
@@ -0,0 +1,97 @@
+# services/user_cache.py
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from fastapi import HTTPException
+
+
+class SingleFlightCache:
+    """
+    Caché TTL acotada (LRU) para respuestas de auth-service.
+
+    - Los 404 se cachean como negativos durante `negative_ttl` segundos.
+    - Varias peticiones concurrentes por la misma clave ausente comparten una
+      única llamada en vuelo (single-flight) en lugar de repetirla.
+    - `invalidate` también descarta la carga en vuelo: las peticiones
+      posteriores empiezan una nueva y el resultado de la anterior, que puede
+      ser previo a la escritura, no se guarda.
+    """
+
+    _NOT_FOUND = object()
+
+    def __init__(self, max_size: int, ttl: float, negative_ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                if value is self._NOT_FOUND:
+                    raise HTTPException(status_code=404, detail="User not found")
+                return value
+            del self._data[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._in_flight[key] = task
+        else:
+            self.coalesced += 1
+        # shield: si un llamante se cancela, la carga compartida sigue para los demás
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        task = asyncio.current_task()
+        try:
+            value = await loader()
+        except HTTPException as e:
+            if e.status_code == 404 and self._in_flight.get(key) is task:
+                self._store(key, self._NOT_FOUND, self.negative_ttl)
+            raise
+        else:
+            # Si se invalidó la clave durante la carga, el valor puede estar obsoleto
+            if self._in_flight.get(key) is task:
+                self._store(key, value, self.ttl)
+            return value
+        finally:
+            if self._in_flight.get(key) is task:
+                del self._in_flight[key]
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+        # Quien ya la esperaba recibe su resultado, pero no se cachea ni se comparte más
+        self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
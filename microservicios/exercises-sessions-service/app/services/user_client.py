@@ -1,14 +1,30 @@
 # services/user_client.py
 
+from typing import Dict, List, Optional
+
 import httpx
 from fastapi import HTTPException
 
-AUTH_SERVICE_URL = "http://auth-service:8001"  # Usa el puerto interno expuesto por el container del auth-service
+from app.core.config import settings
+from app.services.http_client import get_http_client, request_timeout
+from app.services.user_cache import SingleFlightCache
+
+# username -> datos del usuario en auth-service
+user_by_username_cache = SingleFlightCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    negative_ttl=settings.USER_CACHE_NEGATIVE_TTL_SECONDS,
+)
+
+
+class BatchEndpointUnavailable(Exception):
+    """auth-service no expone POST /users/batch (versión anterior)."""
 
-async def validate_user_exists(user_id: str):
+
+async def validate_user_exists(user_id: str, timeout: Optional[float] = None):
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{AUTH_SERVICE_URL}/users/{user_id}")
+        client = get_http_client()
+        response = await client.get(f"/users/{user_id}", timeout=request_timeout(timeout))
 
         
         if response.status_code == 404:
@@ -23,11 +39,37 @@ async def validate_user_exists(user_id: str):
         raise HTTPException(status_code=503, detail=f"User service not available: {e}")
 
 
-async def get_user_by_username(username: str):
+async def get_users_batch(user_ids: List[str], timeout: Optional[float] = None) -> Dict[str, Optional[dict]]:
+    """
+    Resuelve varios usuarios por id en una sola llamada a POST /users/batch.
+    Devuelve un mapa id -> usuario, con None para los que no existen.
+    """
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{AUTH_SERVICE_URL}/users/by-username/{username}")
-            print(f"Código de respuesta: {response.status_code}")
+        client = get_http_client()
+        response = await client.post(
+            "/users/batch", json={"ids": list(user_ids)}, timeout=request_timeout(timeout)
+        )
+        if response.status_code in (404, 405):
+            raise BatchEndpointUnavailable()
+        elif response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail="Error from auth service")
+        return response.json()["by_id"]
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=503, detail=f"User service not available: {e}")
+
+
+async def get_user_by_username(username: str, timeout: Optional[float] = None):
+    """Resuelve un usuario por username pasando por la caché single-flight."""
+    return await user_by_username_cache.get_or_load(
+        username, lambda: _fetch_user_by_username(username, timeout)
+    )
+
+
+async def _fetch_user_by_username(username: str, timeout: Optional[float] = None):
+    try:
+        client = get_http_client()
+        response = await client.get(f"/users/by-username/{username}", timeout=request_timeout(timeout))
+        print(f"Código de respuesta: {response.status_code}")
         if response.status_code == 404:
             raise HTTPException(status_code=404, detail="User not found")
         elif response.status_code != 200:
@@ -36,10 +78,11 @@ async def get_user_by_username(username: str):
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"User service not available: {e}")
 
-async def delete_user_by_username(username: str):
+async def delete_user_by_username(username: str, timeout: Optional[float] = None):
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.delete(f"{AUTH_SERVICE_URL}/users/by-username/{username}")
+        client = get_http_client()
+        response = await client.delete(f"/users/by-username/{username}", timeout=request_timeout(timeout))
+        user_by_username_cache.invalidate(username)
         if response.status_code == 404:
             raise HTTPException(status_code=404, detail="User not found")
         elif response.status_code != 204:
@@ -48,14 +91,20 @@ async def delete_user_by_username(username: str):
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"User service not available: {e}")
     
-async def update_user_by_username(username: str, update_data: dict):
+async def update_user_by_username(username: str, update_data: dict, timeout: Optional[float] = None):
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.patch(f"{AUTH_SERVICE_URL}/users/by-username/{username}", json=update_data)
+        client = get_http_client()
+        response = await client.patch(
+            f"/users/by-username/{username}", json=update_data, timeout=request_timeout(timeout)
+        )
+        user_by_username_cache.invalidate(username)
+        if "username" in update_data:
+            # Puede haber un 404 cacheado para el nombre nuevo
+            user_by_username_cache.invalidate(update_data["username"])
         if response.status_code == 404:
             raise HTTPException(status_code=404, detail="User not found")
         elif response.status_code != 200:
             raise HTTPException(status_code=response.status_code, detail="Error from auth service")
         return response.json()
     except httpx.RequestError as e:
-        raise HTTPException(status_code=503, detail=f"User service not available: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=503, detail=f"User service not available: {e}")
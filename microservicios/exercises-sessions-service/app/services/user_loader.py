@@ -0,0 +1,104 @@
+# services/user_loader.py
+
+import asyncio
+from typing import Awaitable, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.user_client import BatchEndpointUnavailable, get_users_batch, validate_user_exists
+
+# Se desactiva la primera vez que auth-service responde que no tiene /users/batch
+_batch_endpoint_available = True
+
+
+class UserLoader:
+    """
+    Cargador de usuarios por id al estilo DataLoader, con ámbito de petición.
+
+    Las llamadas a `load` hechas en el mismo ciclo del event loop se acumulan,
+    se deduplican y se resuelven juntas: en lotes de como máximo
+    `max_batch_size` ids contra POST /users/batch o, si auth-service no lo
+    expone, con como mucho `max_concurrency` peticiones individuales a la vez.
+    Los usuarios que no existen se resuelven como None.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = settings.USER_LOADER_MAX_BATCH_SIZE,
+        max_concurrency: int = settings.USER_LOADER_MAX_CONCURRENCY,
+    ):
+        self.max_batch_size = max_batch_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        self._dispatch_scheduled = False
+        # Número de ids realmente pedidos a auth-service
+        self.lookups = 0
+
+    def load(self, user_id) -> Awaitable[Optional[dict]]:
+        key = str(user_id)
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            self._queue.append(key)
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return future
+
+    async def load_many(self, user_ids: Iterable) -> List[Optional[dict]]:
+        return await asyncio.gather(*(self.load(user_id) for user_id in user_ids))
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        self._dispatch_scheduled = False
+        batches = [
+            keys[i:i + self.max_batch_size] for i in range(0, len(keys), self.max_batch_size)
+        ]
+        await asyncio.gather(*(self._load_batch(batch) for batch in batches))
+
+    async def _load_batch(self, keys: List[str]) -> None:
+        global _batch_endpoint_available
+        self.lookups += len(keys)
+        try:
+            results = None
+            if _batch_endpoint_available:
+                try:
+                    async with self._semaphore:
+                        results = await get_users_batch(keys)
+                except BatchEndpointUnavailable:
+                    _batch_endpoint_available = False
+            if results is None:
+                results = await self._load_individually(keys)
+        except Exception as e:
+            for key in keys:
+                _resolve(self._futures[key], exception=e)
+            return
+
+        for key in keys:
+            _resolve(self._futures[key], result=results.get(key))
+
+    async def _load_individually(self, keys: List[str]) -> Dict[str, Optional[dict]]:
+        async def load_one(key: str) -> Optional[dict]:
+            async with self._semaphore:
+                try:
+                    return await validate_user_exists(key)
+                except HTTPException as e:
+                    if e.status_code == 404:
+                        return None
+                    raise
+
+        users = await asyncio.gather(*(load_one(key) for key in keys))
+        return dict(zip(keys, users))
+
+
+def _resolve(future: asyncio.Future, result=None, exception: Optional[BaseException] = None) -> None:
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
@@ -0,0 +1,146 @@
+# benchmarks/bench_http_client.py
+"""
+Llamadas a auth-service con el cliente compartido frente a un cliente nuevo
+por llamada (el comportamiento anterior).
+
+Arranca benchmarks.stand_in_auth con uvicorn en otro proceso y hace
+`--calls` llamadas a validate_user_exists con `--concurrency` a la vez,
+como el gather de los listados. Mide la latencia por llamada, las conexiones
+TCP que ve el servidor y el máximo de sockets abiertos a la vez en este
+proceso (leído de /proc/self/fd, solo Linux). Uso:
+
+    python -m benchmarks.bench_http_client [--calls 1000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+PORT = _free_port()
+os.environ["AUTH_SERVICE_URL"] = f"http://127.0.0.1:{PORT}"
+
+from fastapi import HTTPException  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.http_client import close_http_client, start_http_client  # noqa: E402
+from app.services.user_client import validate_user_exists  # noqa: E402
+
+
+async def validate_user_exists_per_call(user_id: str):
+    # Versión anterior de validate_user_exists: un AsyncClient (y un socket) por llamada
+    try:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.get(f"{settings.AUTH_SERVICE_URL}/users/{user_id}")
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail="Error from auth service")
+        return response.json()
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=503, detail=f"User service not available: {e}")
+
+
+def _open_sockets() -> int:
+    count = 0
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            count += os.readlink(f"/proc/self/fd/{fd}").startswith("socket:")
+        except OSError:
+            pass
+    return count
+
+
+async def _run(name: str, validate, calls: int, concurrency: int) -> None:
+    async with httpx.AsyncClient(base_url=settings.AUTH_SERVICE_URL) as control:
+        await control.post("/stats/reset")
+        baseline_sockets = _open_sockets()
+        peak_sockets = 0
+        latencies = []
+        errors = 0
+        semaphore = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+
+        async def sample_sockets():
+            nonlocal peak_sockets
+            while not done.is_set():
+                peak_sockets = max(peak_sockets, _open_sockets() - baseline_sockets)
+                await asyncio.sleep(0.005)
+
+        async def call():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await validate(str(uuid.uuid4()))
+                except HTTPException:
+                    # Timeouts o conexiones rechazadas (503)
+                    errors += 1
+                    return
+                latencies.append(time.perf_counter() - start)
+
+        sampler = asyncio.create_task(sample_sockets())
+        started = time.perf_counter()
+        await asyncio.gather(*(call() for _ in range(calls)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await sampler
+        stats = (await control.get("/stats")).json()
+
+    ms = sorted(latency * 1000 for latency in latencies)
+    p99 = statistics.quantiles(ms, n=100, method="inclusive")[98]
+    print(
+        f"{name:<9} {len(latencies) / elapsed:8.0f} llamadas/s  errores={errors:<4}  p50={statistics.median(ms):6.1f} ms  "
+        f"p99={p99:6.1f} ms  conexiones={stats['connections']:<5} sockets abiertos (máx)={peak_sockets}"
+    )
+
+
+async def _main(calls: int, concurrency: int) -> None:
+    # Calentamiento del servidor, fuera de la medición
+    await _run("warm-up", validate_user_exists_per_call, min(calls, 50), min(concurrency, 10))
+    await _run("per-call", validate_user_exists_per_call, calls, concurrency)
+    start_http_client()
+    try:
+        await _run("pooled", validate_user_exists, calls, concurrency)
+    finally:
+        await close_http_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.stand_in_auth:app",
+         "--port", str(PORT), "--log-level", "warning", "--no-access-log"],
+    )
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"{settings.AUTH_SERVICE_URL}/stats")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        print(f"{args.calls} llamadas, {args.concurrency} concurrentes, "
+              f"HTTP_MAX_CONNECTIONS={settings.HTTP_MAX_CONNECTIONS}")
+        asyncio.run(_main(args.calls, args.concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
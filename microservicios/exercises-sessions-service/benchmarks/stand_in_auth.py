@@ -0,0 +1,36 @@
+# benchmarks/stand_in_auth.py
+"""
+Sustituto mínimo de auth-service para los benchmarks: responde a
+GET /users/{user_id} y cuenta las conexiones TCP distintas (puerto de
+origen) por las que le llegan peticiones. Uso:
+
+    uvicorn benchmarks.stand_in_auth:app --port 8765
+"""
+import uuid
+
+from fastapi import FastAPI, Request
+
+app = FastAPI()
+_client_ports = set()
+_requests = 0
+
+
+@app.get("/users/{user_id}")
+async def read_user(user_id: uuid.UUID, request: Request):
+    global _requests
+    _requests += 1
+    _client_ports.add(request.client.port)
+    return {"id": str(user_id), "username": f"user-{user_id.hex[:8]}", "email": "user@example.com"}
+
+
+@app.get("/stats")
+async def read_stats():
+    return {"requests": _requests, "connections": len(_client_ports)}
+
+
+@app.post("/stats/reset")
+async def reset_stats():
+    global _requests
+    _requests = 0
+    _client_ports.clear()
+    return {}
@@ -0,0 +1,103 @@
+# tests/test_user_cache.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.user_cache import SingleFlightCache
+
+
+def _cache() -> SingleFlightCache:
+    return SingleFlightCache(max_size=100, ttl=60, negative_ttl=60)
+
+
+class _Backend:
+    """Origen de datos con una escritura que cambia el valor devuelto."""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def load(self):
+        self.calls += 1
+        value = self.value
+        await self.release.wait()
+        if value is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return value
+
+
+async def _started(backend: _Backend, calls: int = 1) -> None:
+    for _ in range(100):
+        if backend.calls >= calls:
+            return
+        await asyncio.sleep(0)
+
+
+def test_concurrent_lookups_share_one_load():
+    async def scenario():
+        cache, backend = _cache(), _Backend("ana")
+        lookups = [asyncio.ensure_future(cache.get_or_load("ana", backend.load)) for _ in range(5)]
+        await _started(backend)
+        backend.release.set()
+        assert await asyncio.gather(*lookups) == ["ana"] * 5
+        assert backend.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_discards_the_load_in_flight():
+    async def scenario():
+        cache, backend = _cache(), _Backend("old")
+        before_write = asyncio.ensure_future(cache.get_or_load("key", backend.load))
+        await _started(backend)
+
+        # Escritura mientras la carga anterior sigue en vuelo
+        backend.value = "new"
+        cache.invalidate("key")
+        after_write = asyncio.ensure_future(cache.get_or_load("key", backend.load))
+        await _started(backend, calls=2)
+        backend.release.set()
+
+        assert await before_write == "old"
+        assert await after_write == "new"
+        assert backend.calls == 2
+        # Lo cacheado es el valor posterior a la escritura
+        assert await cache.get_or_load("key", backend.load) == "new"
+        assert backend.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_stale_load_finishing_last_does_not_overwrite():
+    async def scenario():
+        cache = _cache()
+        stale, fresh = _Backend("old"), _Backend("new")
+        before_write = asyncio.ensure_future(cache.get_or_load("key", stale.load))
+        await _started(stale)
+        cache.invalidate("key")
+        fresh.release.set()
+        assert await cache.get_or_load("key", fresh.load) == "new"
+
+        stale.release.set()
+        assert await before_write == "old"
+        assert await cache.get_or_load("key", stale.load) == "new"
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_discards_a_pending_not_found():
+    async def scenario():
+        cache, backend = _cache(), _Backend(None)
+        lookup = asyncio.ensure_future(cache.get_or_load("bob", backend.load))
+        await _started(backend)
+        # El usuario se crea (o se renombra a "bob") durante la consulta
+        backend.value = {"username": "bob"}
+        cache.invalidate("bob")
+        backend.release.set()
+        with pytest.raises(HTTPException):
+            await lookup
+        assert await cache.get_or_load("bob", backend.load) == {"username": "bob"}
+
+    asyncio.run(scenario())